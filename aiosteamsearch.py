@@ -23,14 +23,34 @@ SOFTWARE.
 """
 
 
+import array
 import asyncio
+import atexit
 import aiohttp
+import bisect
+import calendar
+import collections
+import concurrent.futures
+import copy
+import email.utils
+import functools
+import html
+import itertools
 import operator
 import json
 import math
+import mmap
+import os
+import queue
 import re
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
 from urllib import parse
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
 
 # used to map currency symbols to currency codes
 CURRENCY_MAP = {
@@ -100,11 +120,87 @@ VALID_CURRENCIES = ['AED', 'AFN', 'ALL', 'AMD', 'ANG', 'AOA', 'ARS', 'AUD', 'AWG
                     'NMC', 'NVC', 'NXT', 'PPC', 'STR', 'VTC', 'XCP', 'XEM', 'XMR', 'XPM', 'XRP', 'VEF_BLKMKT',
                     'VEF_SIMADI']
 
+# maps currency codes to the ids the market's priceoverview endpoint uses for them
+MARKET_CURRENCIES = {
+    "USD": 1, "GBP": 2, "EUR": 3, "CHF": 4, "RUB": 5, "PLN": 6, "BRL": 7, "JPY": 8, "NOK": 9, "IDR": 10, "MYR": 11,
+    "PHP": 12, "SGD": 13, "THB": 14, "VND": 15, "KRW": 16, "TRY": 17, "UAH": 18, "MXN": 19, "CAD": 20, "AUD": 21,
+    "NZD": 22, "CNY": 23, "INR": 24, "CLP": 25, "PEN": 26, "COP": 27, "ZAR": 28, "HKD": 29, "TWD": 30, "SAR": 31,
+    "AED": 32
+}
+
 STEAM_KEY = ""  # contains your Steam API key (set using set_key)
-STEAM_CACHE = True  # whether or not steamsearch should cache some results which generally aren't going to change
+STEAM_CACHE = True  # whether or not steamsearch should cache some results which generally aren't going to change, or the path of a SQLite database to cache them in
 STEAM_SESSION = ""  # your Steam Session for SteamCommunityAjax
 STEAM_PRINTING = False  # whether or not steamsearch will occasionally print warnings
 
+STEAM_CACHE_SIZE = 10000  # the maximum number of results kept in the cache
+STEAM_CACHE_TTLS = {  # how long (in seconds) the results in each of the cache's namespaces are kept for
+    "gameid": 7 * 24 * 60 * 60,  # search terms to (appid, appname) tuples
+    "userid": 24 * 60 * 60,  # search terms to steamids
+    "item_name": 7 * 24 * 60 * 60,  # search terms to item url names
+}
+STEAM_NEGATIVE_CACHE_SIZE = 10000  # the maximum number of failed lookups kept in the negative cache
+STEAM_NEGATIVE_CACHE_TTLS = {  # how long (in seconds) failed lookups in each of the negative cache's namespaces are kept for
+    "gameid": 10 * 60,  # search terms which found no app
+    "userid": 10 * 60,  # search terms which found no user
+    "vanity": 10 * 60,  # names which aren't anyone's vanity url
+    "item_name": 10 * 60,  # search terms which found no item
+}
+STEAM_MARKET_CACHE_SIZE = 5000  # the maximum number of results from the market's search kept in the market cache
+STEAM_MARKET_CACHE_TTLS = {  # how long (in seconds) the results in each of the market cache's namespaces are kept for
+    "item_name": 24 * 60 * 60,  # item names and url names found by the market's search to item url names
+    "market_asset": 24 * 60 * 60,  # item url names to their asset descriptions from the market's search
+}
+STEAM_STORE_CACHE_SIZE = 2000  # the maximum number of appdetails responses, prices and front pages kept in the store cache
+STEAM_FRONT_PAGE_TTL = 60  # how long (in seconds) the front page of the store is cached for, 0 to disable
+STEAM_COALESCE = True  # whether or not identical requests made at the same time should share one request
+STEAM_RATES_TTL = 60 * 60  # how long (in seconds) the table of exchange rates is used for before it's fetched again
+STEAM_SALES_CONCURRENCY = 20  # the most appdetails requests check_game_sales has in flight at once
+STEAM_APPDETAILS_TTL = 10 * 60  # how long (in seconds) each app's appdetails response is cached for, 0 to disable
+STEAM_APPDETAILS_BATCH_SIZE = 50  # the most appids requested at once from appdetails for their prices
+STEAM_SEARCH_PAGE_SIZE = 50  # how many results iter_search requests from the store's search at once
+STEAM_ITEMS_CONCURRENCY = 10  # the most items get_items fetches at once
+STEAM_RATE_LIMITS = {  # maps hosts to (requests per second, burst) for the requests made to them (see set_rate_limit)
+    "steamcommunity.com": (1.0, 5),
+    "store.steampowered.com": (5.0, 10),
+    "api.steampowered.com": (10.0, 20),
+}
+STEAM_DEFAULT_RATE_LIMIT = (10.0, 20)  # the (requests per second, burst) of hosts which aren't in STEAM_RATE_LIMITS
+STEAM_RATE_DECREASE = 0.5  # what a host's rate is multiplied by when it responds with 429 or 503
+STEAM_RATE_INCREASE = 0.05  # the fraction of a host's configured rate its rate grows by after each successful request
+STEAM_RATE_MIN_FRACTION = 1 / 16  # the lowest fraction of its configured rate a host's rate is cut down to
+STEAM_RATE_RETRIES = 2  # how many times a request which got 429 or 503 is retried before SteamRateLimited is raised
+STEAM_MARKET_SEARCH_COUNT = 100  # how many items get_item_name asks the market's search for, every one found is kept in the market cache
+STEAM_PARSER = "html.parser"  # the BeautifulSoup backend HTML is parsed with (see set_parser)
+STEAM_PARSE_EXECUTOR = "thread"  # where HTML is parsed, "thread", "process" or None for on the event loop (see set_parse_executor)
+STEAM_PARSE_WORKERS = 4  # how many threads or processes HTML is parsed in
+STEAM_USER_BATCH_WINDOW = 0.01  # how long (in seconds) get_user waits for other calls to batch together, 0 to disable
+STEAM_APP_INDEX_MIN_SCORE = 0.6  # how similar (0 to 1) a name has to be to match an app in the local app index by trigrams
+
+STEAM_CONNECTION_LIMIT = 100  # the maximum number of open connections in the shared session's pool
+STEAM_CONNECTION_LIMIT_PER_HOST = 20  # the maximum number of open connections to any one steam host
+STEAM_DNS_CACHE_TTL = 300  # how long (in seconds) resolved host names are cached for
+STEAM_KEEPALIVE_TIMEOUT = 30  # how long (in seconds) an idle connection is kept alive for
+
+_session = None  # the shared aiohttp.ClientSession used for every request (see startup)
+_session_loop = None  # the event loop _session was created on
+
+_rates = None  # a tuple of (expiry time, dict mapping currency codes to exchange rates)
+_rates_task = None  # the task refreshing _rates in the background (see start_rates_refresh)
+
+_user_batch = None  # the _UserBatch get_user calls are currently being added to
+_user_batch_tasks = set()  # the requests of flushed batches, kept so they aren't garbage collected before they finish
+
+_parse_executor = None  # the executor HTML is currently parsed in, created on first use (see _get_parse_executor)
+_parse_futures = set()  # the futures of parses submitted to _parse_executor which haven't finished yet
+_parse_count = 0  # how many parses have finished in _parse_executor
+_parse_local = threading.local()  # the parser chosen when the current thread's parse was queued (see _run_parse)
+
+_buckets = {}  # maps hosts to the _TokenBucket pacing requests to them (see _throttle)
+
+_in_flight = {}  # maps the keys of calls currently in progress to their futures (see _single_flight)
+_coalesce_stats = {"calls": 0, "coalesced": 0}  # counts calls made and calls which shared an in-flight call
+
 
 def set_key(key, session, cache=True, printing=False):
     """Used to initiate your key + session strings, also to enable/disable caching
@@ -112,22 +208,43 @@ def set_key(key, session, cache=True, printing=False):
     Args:
         key (str): Your Steam API key
         session (str): Your SteamCommunityAjax session, this basically just needs to be any string containing only a-z, A-Z or 0-9
-        cache (bool, optional): True to enable caching
+        cache (bool | str, optional): True to enable caching, or the path of a SQLite database to enable caching
+            and also keep the cached results on disk (see set_cache_path)
     """
     global STEAM_KEY, STEAM_CACHE, STEAM_SESSION, STEAM_PRINTING
     STEAM_KEY = key
     STEAM_SESSION = session
     STEAM_CACHE = cache
     STEAM_PRINTING = printing
+    set_cache_path(cache if isinstance(cache, str) else None)
+
+
+def set_parser(parser="lxml"):
+    """Used to choose the backend HTML is parsed with, lxml is several times faster than python's html.parser
+
+    Args:
+        parser (str, optional): the name of any BeautifulSoup tree builder (e.g. "lxml", "html5lib" or "html.parser"),
+            if it isn't installed "html.parser" is used instead
+    Returns:
+        str: the name of the parser which will be used
+    """
+    global STEAM_PARSER
+    if builder_registry.lookup(parser) is None:
+        if STEAM_PRINTING:
+            print("parser %s isn't installed, using html.parser instead" % parser)
+        parser = "html.parser"
+    STEAM_PARSER = parser
+    return parser
 
 
 def count_cache():
-    """Counts the amount of cached results
+    """Counts the amount of cached results, if the cache is kept in a SQLite database this reads the database,
+    so from a coroutine use await cache.acount() to keep the event loop running
 
     Returns:
         the number of cached results (int)
     """
-    return len(gameid_cache) + len(item_name_cache) + len(userid_cache)
+    return cache.count() + negative_cache.count()
 
 
 def clear_cache():
@@ -136,12 +253,136 @@ def clear_cache():
     Returns:
         the number of results cleared
     """
-    global gameid_cache, item_name_cache, userid_cache
-    items = count_cache()
-    gameid_cache = {}
-    item_name_cache = {}
-    userid_cache = {}
-    return items
+    return cache.clear() + negative_cache.clear()
+
+
+def set_cache_path(path):
+    """Used to keep cached names, steamids and item names in a SQLite database as well as in memory, so they
+    survive restarts and can be shared by every process on the machine using the same path.
+    Replaces the current cache if the path has changed.
+
+    Args:
+        path (str): the path of the database file, or None to only keep cached results in memory
+    """
+    global cache
+    current = cache.path if isinstance(cache, SteamSQLiteCache) else None
+    if path == current:
+        return
+    if current is not None:
+        cache.close()
+    if path is None:
+        cache = SteamCache(STEAM_CACHE_SIZE, STEAM_CACHE_TTLS)
+    else:
+        cache = SteamSQLiteCache(path, STEAM_CACHE_SIZE, STEAM_CACHE_TTLS)
+
+
+def compact_cache():
+    """Removes expired results from the cache, and vacuums the database if the cache is kept on disk
+
+    Returns:
+        the number of results removed
+    """
+    return cache.compact()
+
+
+def cache_stats():
+    """Gets statistics about the cache
+
+    Returns:
+        a dict mapping each namespace (e.g. gameid) to a dict of its "size", "hits", "misses", "evictions" and "expired" counts
+    """
+    return cache.stats()
+
+
+def negative_cache_stats():
+    """Gets statistics about the negative cache, which remembers lookups that found nothing
+
+    Returns:
+        a dict mapping each namespace (e.g. gameid) to a dict of its "size", "hits", "misses", "evictions" and "expired" counts
+    """
+    return negative_cache.stats()
+
+
+def set_negative_cache_options(max_size=10000, ttls=None):
+    """Used to configure the size of the negative cache and how long failed lookups are remembered for
+
+    Args:
+        max_size (int, optional): the maximum number of failed lookups to keep, 0 or less for no limit
+        ttls (dict, optional): maps namespaces ("gameid", "userid", "vanity" or "item_name") to how long (in seconds)
+            their failed lookups are kept for
+    """
+    global STEAM_NEGATIVE_CACHE_SIZE
+    STEAM_NEGATIVE_CACHE_SIZE = max_size
+    STEAM_NEGATIVE_CACHE_TTLS.update(ttls or {})
+    negative_cache.max_size = max_size
+    negative_cache.ttls.update(ttls or {})
+
+
+def market_cache_stats():
+    """Gets statistics about the market cache, which keeps every item found by the market's search
+
+    Returns:
+        a dict mapping each namespace (e.g. market_asset) to a dict of its "size", "hits", "misses", "evictions" and "expired" counts
+    """
+    return market_cache.stats()
+
+
+def set_market_cache_options(max_size=5000, ttls=None):
+    """Used to configure the size of the market cache and how long the items found by the market's search are kept for,
+    it's kept apart from the cache so that searches returning many items don't evict cached names
+
+    Args:
+        max_size (int, optional): the maximum number of results to keep, 0 or less for no limit
+        ttls (dict, optional): maps namespaces ("item_name" or "market_asset") to how long (in seconds)
+            their results are kept for
+    """
+    global STEAM_MARKET_CACHE_SIZE
+    STEAM_MARKET_CACHE_SIZE = max_size
+    STEAM_MARKET_CACHE_TTLS.update(ttls or {})
+    market_cache.max_size = max_size
+    market_cache.ttls.update(ttls or {})
+
+
+def store_cache_stats():
+    """Gets statistics about the store cache, which keeps appdetails responses, prices and front pages
+
+    Returns:
+        a dict mapping each namespace (e.g. appdetails) to a dict of its "size", "hits", "misses", "evictions" and "expired" counts
+    """
+    return store_cache.stats()
+
+
+def set_store_cache_options(max_size=2000, appdetails_ttl=None, front_page_ttl=None):
+    """Used to configure the size of the store cache and how long its results are kept for,
+    it's kept apart from the cache so that checking many games' prices doesn't evict cached names
+
+    Args:
+        max_size (int, optional): the maximum number of results to keep, 0 or less for no limit
+        appdetails_ttl (int, optional): how long (in seconds) appdetails responses and prices are kept for, 0 to disable
+        front_page_ttl (int, optional): how long (in seconds) front pages are kept for, 0 to disable
+    """
+    global STEAM_STORE_CACHE_SIZE, STEAM_APPDETAILS_TTL, STEAM_FRONT_PAGE_TTL
+    STEAM_STORE_CACHE_SIZE = max_size
+    if appdetails_ttl is not None:
+        STEAM_APPDETAILS_TTL = appdetails_ttl
+    if front_page_ttl is not None:
+        STEAM_FRONT_PAGE_TTL = front_page_ttl
+    store_cache.max_size = max_size
+
+
+def set_cache_options(max_size=10000, ttls=None):
+    """Used to configure the size of the cache and how long results are kept for
+
+    Args:
+        max_size (int, optional): the maximum number of results to keep, 0 or less for no limit
+        ttls (dict, optional): maps namespaces ("gameid", "userid" or "item_name") to how long (in seconds)
+            their results are kept for, or None to keep them until they're evicted
+    """
+    global STEAM_CACHE_SIZE
+    STEAM_CACHE_SIZE = max_size
+    STEAM_CACHE_TTLS.update(ttls or {})
+    cache.max_size = max_size
+    cache.ttls.update(ttls or {})
 
 
 class SteamKeyNotSet(Exception):
@@ -154,6 +395,356 @@ class SteamSessionNotSet(Exception):
     pass
 
 
+class SteamRateLimited(Exception):
+    """Exception raised if a host kept responding with 429 or 503 after every retry"""
+    pass
+
+
+_MISSING = object()  # returned by SteamCache.get when a result isn't cached
+
+
+class SteamCache:
+    """A bounded cache which evicts the least recently used results, results in each namespace expire after that namespace's TTL"""
+    def __init__(self, max_size=10000, ttls=None):
+        """
+
+        Args:
+            max_size (int, optional): the maximum number of results to hold, 0 or less for no limit
+            ttls (dict, optional): maps namespaces to how long (in seconds) their results are kept for,
+                namespaces which aren't in ttls (or map to None) never expire
+        """
+        self.max_size = max_size
+        self.ttls = dict(ttls or {})
+        self._data = collections.OrderedDict()  # maps (namespace, key) to (expiry time, value), oldest first
+        self._stats = {}  # maps namespaces to their hit/miss/eviction/expiry counters
+        self._lock = threading.RLock()
+
+    def _stat(self, namespace, name):
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        stats[name] = stats.get(name, 0) + 1
+
+    def get(self, namespace, key, default=None):
+        """Gets a result from the cache
+
+        Args:
+            namespace (str): the namespace the result was stored in (e.g. gameid)
+            key: the key the result was stored under
+            default (optional): what to return if the result isn't cached
+        Returns:
+            the cached result, or default if there isn't one or it has expired
+        """
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is None:
+                self._stat(namespace, "misses")
+                return default
+            if entry[0] is not None and entry[0] <= time.monotonic():
+                del self._data[(namespace, key)]
+                self._stat(namespace, "expired")
+                self._stat(namespace, "misses")
+                return default
+            self._data.move_to_end((namespace, key))
+            self._stat(namespace, "hits")
+            return entry[1]
+
+    async def aget(self, namespace, key, default=None):
+        """Gets a result from the cache from a coroutine, see get"""
+        return self.get(namespace, key, default)
+
+    def set(self, namespace, key, value, ttl=None):
+        """Stores a result in the cache, evicting the least recently used results if the cache is full
+
+        Args:
+            namespace (str): the namespace to store the result in
+            key: the key to store the result under
+            value: the result
+            ttl (int, optional): how long (in seconds) to keep the result for, defaults to the namespace's TTL
+        """
+        if ttl is None:
+            ttl = self.ttls.get(namespace)
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[(namespace, key)] = (expires, value)
+            self._data.move_to_end((namespace, key))
+            while 0 < self.max_size < len(self._data):
+                (old_namespace, _), _ = self._data.popitem(last=False)
+                self._stat(old_namespace, "evictions")
+
+    def count(self, namespace=None):
+        """Counts the results in the cache
+
+        Args:
+            namespace (str, optional): only count results in this namespace
+        Returns:
+            the number of cached results (int)
+        """
+        with self._lock:
+            if namespace is None:
+                return len(self._data)
+            return sum(1 for ns, _ in self._data if ns == namespace)
+
+    async def acount(self, namespace=None):
+        """Counts the results in the cache from a coroutine, see count"""
+        return self.count(namespace)
+
+    def clear(self, namespace=None):
+        """Removes results from the cache
+
+        Args:
+            namespace (str, optional): only remove results in this namespace
+        Returns:
+            the number of results removed (int)
+        """
+        with self._lock:
+            if namespace is None:
+                items = len(self._data)
+                self._data.clear()
+                return items
+            keys = [k for k in self._data if k[0] == namespace]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def stats(self):
+        """Gets the cache's statistics
+
+        Returns:
+            a dict mapping each namespace to a dict of its "size", "hits", "misses", "evictions" and "expired" counts,
+            plus "disk_hits" (misses which were found on disk) for a SteamSQLiteCache
+        """
+        with self._lock:
+            stats = {ns: dict(counts, size=0) for ns, counts in self._stats.items()}
+            for ns, _ in self._data:
+                if ns not in stats:
+                    stats[ns] = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "size": 0}
+                stats[ns]["size"] += 1
+            return stats
+
+    def compact(self):
+        """Removes every expired result from the cache
+
+        Returns:
+            the number of results removed (int)
+        """
+        return len(self._compact())
+
+    def _compact(self):
+        """Internal method which removes every expired result, see compact
+
+        Returns:
+            a list of the (namespace, key) of each result removed
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (expires, _) in self._data.items() if expires is not None and expires <= now]
+            for k in expired:
+                del self._data[k]
+                self._stat(k[0], "expired")
+            return expired
+
+
+class SteamSQLiteCache(SteamCache):
+    """A SteamCache which also keeps results on disk in a SQLite database (in WAL mode), so that they survive
+    restarts and can be shared between several processes on the same machine.
+
+    Writes are batched and made by a background thread, and reads give up after busy_timeout, so a database
+    locked by another process is treated as a miss. aget and acount read the database in the event loop's
+    default executor, so coroutines should use them instead of get and count"""
+    def __init__(self, path, max_size=10000, ttls=None, namespaces=("gameid", "userid", "item_name"),
+                 busy_timeout=0.1):
+        """
+
+        Args:
+            path (str): the path of the database file, it's created if it doesn't exist
+            max_size (int, optional): the maximum number of results to hold in memory, 0 or less for no limit
+            ttls (dict, optional): maps namespaces to how long (in seconds) their results are kept for
+            namespaces (tuple, optional): the namespaces which are kept on disk, results must be JSON serializable
+            busy_timeout (float, optional): how long in seconds a read waits for the database to be unlocked
+        """
+        super().__init__(max_size, ttls)
+        self.path = path
+        self.namespaces = set(namespaces)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()  # sqlite3 connections can't be shared between threads
+        self._connections = []  # every thread's connection, so close() can close them all
+        self._writes = queue.Queue()
+        self._writer = None
+        connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS cache ("
+                               "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires REAL, "
+                               "PRIMARY KEY (namespace, key))")
+        finally:
+            connection.close()
+
+    def _connect(self, timeout):
+        # check_same_thread is off so close() can close other threads' connections, each is still only used by one
+        connection = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect(self.busy_timeout)
+        return connection
+
+    def _write(self, query, args):
+        """Internal method to queue a write for the writer thread, starting it if it isn't running"""
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="steamsearch-cache-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)  # the writer is a daemon thread, so make its queued writes before exiting
+        self._writes.put((query, args))
+
+    def _write_loop(self):
+        """Internal method run by the writer thread, makes every queued write in one transaction until stopped"""
+        connection = self._connect(30)
+        running = True
+        while running:
+            batch = [self._writes.get()]
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                connection.execute("BEGIN")
+                for write in batch:
+                    if write is None:
+                        running = False
+                    else:
+                        connection.execute(*write)
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                if connection.in_transaction:
+                    connection.rollback()
+                if STEAM_PRINTING:
+                    print("failed to write %s results to the cache at %s" % (len(batch), self.path))
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def flush(self):
+        """Blocks until every queued write has been made to the database"""
+        self._writes.join()
+
+    def get(self, namespace, key, default=None):
+        value = super().get(namespace, key, _MISSING)
+        if value is not _MISSING or namespace not in self.namespaces:
+            return default if value is _MISSING else value
+        return self._read(namespace, key, default)
+
+    async def aget(self, namespace, key, default=None):
+        value = SteamCache.get(self, namespace, key, _MISSING)
+        if value is not _MISSING or namespace not in self.namespaces:
+            return default if value is _MISSING else value
+        return await asyncio.get_running_loop().run_in_executor(None, self._read, namespace, key, default)
+
+    def _read(self, namespace, key, default):
+        """Internal method which reads a result missing from memory from the database, see get"""
+        now = time.time()
+        try:
+            row = self._connection().execute("SELECT value, expires FROM cache WHERE namespace = ? AND key = ? "
+                                             "AND (expires IS NULL OR expires > ?)", (namespace, key, now)).fetchone()
+        except sqlite3.OperationalError:
+            return default  # the database is locked, it's quicker to fetch the result again than to wait
+        if row is None:
+            return default
+        value = json.loads(row[0])
+        if isinstance(value, list):
+            value = tuple(value)
+        with self._lock:
+            self._stat(namespace, "disk_hits")
+        super().set(namespace, key, value, ttl=row[1] - now if row[1] is not None else None)
+        return value
+
+    def set(self, namespace, key, value, ttl=None):
+        super().set(namespace, key, value, ttl=ttl)
+        if namespace in self.namespaces:
+            if ttl is None:
+                ttl = self.ttls.get(namespace)
+            expires = time.time() + ttl if ttl is not None else None
+            self._write("INSERT OR REPLACE INTO cache (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                        (namespace, key, json.dumps(value), expires))
+
+    def count(self, namespace=None):
+        if namespace is not None and namespace not in self.namespaces:
+            return super().count(namespace)
+        self.flush()
+        query = "SELECT COUNT(*) FROM cache WHERE (expires IS NULL OR expires > ?)"
+        args = (time.time(),)
+        if namespace is not None:
+            query += " AND namespace = ?"
+            args += (namespace,)
+        items = self._connection().execute(query, args).fetchone()[0]
+        if namespace is None:
+            with self._lock:
+                items += sum(1 for ns, _ in self._data if ns not in self.namespaces)
+        return items
+
+    async def acount(self, namespace=None):
+        return await asyncio.get_running_loop().run_in_executor(None, self.count, namespace)
+
+    def clear(self, namespace=None):
+        items = self.count(namespace)
+        super().clear(namespace)
+        if namespace is None:
+            self._write("DELETE FROM cache", ())
+        elif namespace in self.namespaces:
+            self._write("DELETE FROM cache WHERE namespace = ?", (namespace,))
+        self.flush()
+        return items
+
+    def compact(self):
+        """Removes expired results from memory and from disk, then vacuums the database to reclaim the space
+
+        Returns:
+            the number of results removed, a result which had expired both in memory and on disk is counted once
+        """
+        removed = {(namespace, str(key)) for namespace, key in self._compact()}
+        self.flush()
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            now = time.time()
+            removed.update(connection.execute("SELECT namespace, key FROM cache WHERE expires IS NOT NULL "
+                                              "AND expires <= ?", (now,)).fetchall())
+            connection.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (now,))
+            connection.execute("VACUUM")
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            connection.close()
+        return len(removed)
+
+    def close(self):
+        """Makes any queued writes, then closes every thread's connection to the database"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._writes.put(None)
+            writer.join()
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for connection in connections:
+            connection.close()
+        if writer is not None:
+            atexit.unregister(self.close)
+
+
+cache = SteamCache(STEAM_CACHE_SIZE, STEAM_CACHE_TTLS)  # caches results which generally aren't going to change
+negative_cache = SteamCache(STEAM_NEGATIVE_CACHE_SIZE, STEAM_NEGATIVE_CACHE_TTLS)  # caches lookups which found nothing
+market_cache = SteamCache(STEAM_MARKET_CACHE_SIZE, STEAM_MARKET_CACHE_TTLS)  # caches every item found by the market's search
+store_cache = SteamCache(STEAM_STORE_CACHE_SIZE)  # caches appdetails responses, prices and front pages, each with its own TTL
+
+
 def _check_key_set():
     """Internal method to ensure STEAM_KEY has been set before attempting to use it"""
     if not isinstance(STEAM_KEY, str) or STEAM_KEY == "":
@@ -165,6 +756,517 @@ def _check_session_set():
     if not isinstance(STEAM_KEY, str) or STEAM_SESSION == "":
         raise SteamSessionNotSet
 
+
+def _awaited(func):
+    """Internal decorator for the coroutine methods of results, which steamsearch also hands to synchronous code.
+    Calling one outside of an event loop raises a TypeError, instead of returning a coroutine which never runs"""
+    @functools.wraps(func)
+    def call(self, *args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            raise TypeError("%s.%s is a coroutine, outside of an event loop use steamsearch.%s(result, ...) or "
+                            "steamsearch.convert_many instead" % (type(self).__name__, func.__name__, func.__name__)) from None
+        return func(self, *args, **kwargs)
+    return call
+
+
+def set_connection_options(limit=100, limit_per_host=20, dns_cache_ttl=300, keepalive_timeout=30):
+    """Used to configure the connection pool of the shared session, takes effect the next time the session is created
+
+    Args:
+        limit (int, optional): the maximum number of open connections, 0 for no limit
+        limit_per_host (int, optional): the maximum number of open connections to a single host, 0 for no limit
+        dns_cache_ttl (int, optional): how long in seconds resolved host names are cached for
+        keepalive_timeout (int, optional): how long in seconds an idle connection is kept open for
+    """
+    global STEAM_CONNECTION_LIMIT, STEAM_CONNECTION_LIMIT_PER_HOST, STEAM_DNS_CACHE_TTL, STEAM_KEEPALIVE_TIMEOUT
+    STEAM_CONNECTION_LIMIT = limit
+    STEAM_CONNECTION_LIMIT_PER_HOST = limit_per_host
+    STEAM_DNS_CACHE_TTL = dns_cache_ttl
+    STEAM_KEEPALIVE_TIMEOUT = keepalive_timeout
+
+
+async def startup():
+    """Creates the shared session every request goes through, if it doesn't already exist.
+
+    Calling this is optional, the session is created on first use, but it lets you control when the
+    session is created and is required to apply new set_connection_options settings after a shutdown.
+
+    Returns:
+        aiohttp.ClientSession: the shared session
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(limit=STEAM_CONNECTION_LIMIT,
+                                         limit_per_host=STEAM_CONNECTION_LIMIT_PER_HOST,
+                                         use_dns_cache=True,
+                                         ttl_dns_cache=STEAM_DNS_CACHE_TTL,
+                                         keepalive_timeout=STEAM_KEEPALIVE_TIMEOUT)
+        _session = aiohttp.ClientSession(connector=connector)
+        _session_loop = loop
+    return _session
+
+
+async def shutdown():
+    """Closes the shared session and all of its pooled connections, should be called before your event loop stops"""
+    global _session, _session_loop, _parse_executor
+    await stop_rates_refresh()
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+    if _parse_executor is not None and STEAM_PARSE_EXECUTOR in ("thread", "process"):
+        _parse_executor.shutdown(wait=False)
+        _parse_executor = None
+
+
+def set_rate_limit(host, rate, burst=1):
+    """Used to limit how fast requests are made to a host, requests over the limit wait until they're allowed.
+    The limit is the most a host is ever sent, it's cut whenever the host responds with 429 or 503 and grows
+    back towards the limit as requests succeed
+
+    Args:
+        host (str): the host to limit (e.g. steamcommunity.com)
+        rate (float): how many requests can be made per second on average, None to stop limiting the host
+        burst (int, optional): how many requests can be made at once after the host has been idle
+    Raises:
+        ValueError: if rate isn't more than 0 or burst is less than 1
+    """
+    if rate is not None:
+        _TokenBucket(rate, burst)  # checks the limit now, rather than on the next request to the host
+    STEAM_RATE_LIMITS[host] = (rate, burst) if rate is not None else None
+    _buckets.pop(host, None)
+
+
+def rate_limit_stats():
+    """Gets statistics about the rate limit of every host which has been requested (see set_rate_limit)
+
+    Returns:
+        dict: maps hosts to a dict containing "rate" (the current requests per second), "max_rate" (the configured
+        requests per second), "queued" (requests waiting right now), "requests" (requests sent), "throttled"
+        (responses which were 429 or 503) and "wait_time" (the total seconds requests have spent waiting)
+    """
+    return {host: {"rate": bucket.rate,
+                   "max_rate": bucket.max_rate,
+                   "queued": bucket.queued,
+                   "requests": bucket.requests,
+                   "throttled": bucket.throttled,
+                   "wait_time": bucket.wait_time}
+            for host, bucket in _buckets.items()}
+
+
+class _TokenBucket:
+    """Internal class which paces requests to one host, its rate is adapted to the host's responses by
+    additive increase and multiplicative decrease (see set_rate_limit)"""
+    def __init__(self, rate, burst):
+        """
+
+        Args:
+            rate (float): the most tokens added per second
+            burst (int): the most tokens the bucket holds
+        Raises:
+            ValueError: if rate isn't more than 0 or burst is less than 1
+        """
+        if not rate > 0:
+            raise ValueError("rate must be more than 0, not %s" % rate)
+        if not burst >= 1:
+            raise ValueError("burst must be at least 1, not %s" % burst)
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0  # when the host's last Retry-After ends
+
+        self.queued = 0
+        self.requests = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+
+    async def acquire(self):
+        """Waits until a token is available and takes it"""
+        started = time.monotonic()
+        self.queued += 1
+        try:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                else:
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.queued -= 1
+        self.requests += 1
+        self.wait_time += time.monotonic() - started
+
+    def succeeded(self):
+        """Grows the rate back towards max_rate after a successful request"""
+        self.rate = min(self.max_rate, self.rate + self.max_rate * STEAM_RATE_INCREASE)
+
+    def throttle(self, retry_after=None):
+        """Cuts the rate after the host responded with 429 or 503
+
+        Args:
+            retry_after (float, optional): how many seconds the host asked us to wait before the next request
+        """
+        self.throttled += 1
+        self.rate = max(self.max_rate * STEAM_RATE_MIN_FRACTION, self.rate * STEAM_RATE_DECREASE)
+        self.tokens = 0
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+async def _throttle(url):
+    """Internal method which waits until a request to url is allowed by its host's rate limit (see set_rate_limit)
+
+    Returns:
+        the host's _TokenBucket, or None if the host isn't limited
+    """
+    host = parse.urlsplit(url).hostname
+    bucket = _buckets.get(host)
+    if bucket is None:
+        limit = STEAM_RATE_LIMITS.get(host, STEAM_DEFAULT_RATE_LIMIT)
+        if limit is None:
+            return None
+        bucket = _buckets[host] = _TokenBucket(*limit)
+    await bucket.acquire()
+    return bucket
+
+
+def _parse_retry_after(value):
+    """Internal method which reads a Retry-After header, either a number of seconds or a date
+
+    Returns:
+        float: how many seconds to wait, or None if there's no header or it can't be read
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def coalesce_stats():
+    """Gets statistics about how many calls were coalesced in to a call which was already in flight
+
+    Returns:
+        a dict containing "calls" (the number of calls actually made), "coalesced" (the number of calls
+        which shared the result of one of those calls instead) and "in_flight" (the number of calls running right now)
+    """
+    return {"calls": _coalesce_stats["calls"],
+            "coalesced": _coalesce_stats["coalesced"],
+            "in_flight": len(_in_flight)}
+
+
+def reset_coalesce_stats():
+    """Resets the counters returned by coalesce_stats"""
+    _coalesce_stats["calls"] = 0
+    _coalesce_stats["coalesced"] = 0
+
+
+def set_parse_executor(executor="thread", max_workers=4):
+    """Used to choose where HTML is parsed, parsing a large page on the event loop blocks every other coroutine
+
+    Args:
+        executor (str | concurrent.futures.Executor, optional): "thread" for a thread pool, "process" for a process
+            pool, None to parse on the event loop, or an executor of your own (which won't be shut down by steamsearch)
+        max_workers (int, optional): how many threads or processes the pool has
+    """
+    global STEAM_PARSE_EXECUTOR, STEAM_PARSE_WORKERS, _parse_executor
+    if _parse_executor is not None and STEAM_PARSE_EXECUTOR in ("thread", "process"):
+        _parse_executor.shutdown(wait=False)
+    STEAM_PARSE_EXECUTOR = executor
+    STEAM_PARSE_WORKERS = max_workers
+    _parse_executor = None
+
+
+def parse_stats():
+    """Gets statistics about the parse executor (see set_parse_executor)
+
+    Returns:
+        dict: {"queued": parses waiting for a worker, "running": parses in progress, "parsed": parses finished}
+    """
+    running = sum(1 for future in _parse_futures if future.running())
+    return {"queued": len(_parse_futures) - running, "running": running, "parsed": _parse_count}
+
+
+def _get_parse_executor():
+    """Internal method which gets the executor HTML is parsed in, creating it if it doesn't exist yet"""
+    global _parse_executor
+    if _parse_executor is None:
+        if STEAM_PARSE_EXECUTOR == "thread":
+            _parse_executor = concurrent.futures.ThreadPoolExecutor(max_workers=STEAM_PARSE_WORKERS, thread_name_prefix="steamsearch-parse")
+        elif STEAM_PARSE_EXECUTOR == "process":
+            _parse_executor = concurrent.futures.ProcessPoolExecutor(max_workers=STEAM_PARSE_WORKERS)
+        else:
+            _parse_executor = STEAM_PARSE_EXECUTOR
+    return _parse_executor
+
+
+async def _parse(func, *args):
+    """Internal method which runs a parse function in the parse executor (see set_parse_executor).
+    Parse functions are module level functions which take the raw page and return plain result objects,
+    so that they can be sent to and from a process pool
+
+    Args:
+        func: the parse function
+        *args: the arguments to call func with
+    Returns:
+        whatever func returns
+    """
+    global _parse_count
+    executor = _get_parse_executor()
+    if executor is None:
+        return func(*args)
+
+    future = executor.submit(_run_parse, STEAM_PARSER, func, *args)
+    _parse_futures.add(future)
+    try:
+        return await asyncio.wrap_future(future)
+    finally:
+        _parse_futures.discard(future)
+        _parse_count += 1
+
+
+def _run_parse(parser, func, *args):
+    """Internal method which runs a parse function with the parser chosen when it was queued, in case it's run in
+    another process. The parser is kept in a thread-local, so a queued parse can't undo a later set_parser"""
+    previous = getattr(_parse_local, "parser", None)
+    _parse_local.parser = parser
+    try:
+        return func(*args)
+    finally:
+        _parse_local.parser = previous
+
+
+def _make_soup(markup, parse_only=None):
+    """Internal method which parses some HTML with the chosen parser (see set_parser)
+
+    Args:
+        markup (str | bytes): the HTML to parse
+        parse_only (SoupStrainer, optional): only build the tree for the tags this matches (and their contents),
+            which is much faster and smaller than parsing all of a large page
+    Returns:
+        BeautifulSoup: the parsed HTML
+    """
+    return BeautifulSoup(markup, getattr(_parse_local, "parser", None) or STEAM_PARSER, parse_only=parse_only)
+
+
+def _class_strainer(tag, cls):
+    """Internal method which builds a SoupStrainer matching tags with cls as one of their classes
+
+    Args:
+        tag (str): the name of the tags to match
+        cls (str): the class they need to have
+    Returns:
+        SoupStrainer: the strainer (see _make_soup)
+    """
+    return SoupStrainer(tag, {"class": re.compile(r"(^|\s)" + re.escape(cls) + r"(\s|$)")})
+
+
+def _cut_rows(markup, tag, cls, limit):
+    """Internal method which cuts a page off just before the (limit + 1)th tag with cls as one of its classes,
+    so that parsers which only need limit results don't read the rest of the page
+
+    Args:
+        markup (str | bytes): the page
+        tag (str): the name of the tag each result starts with
+        cls (str): the class the tag of each result has
+        limit (int): how many results are needed, 0 or less means every result
+    Returns:
+        the page (str | bytes), cut short if it has more than limit results
+    """
+    if limit <= 0:
+        return markup
+    pattern = r"<" + tag + r"\s[^>]*class=[\"'][^\"']*\b" + re.escape(cls) + r"\b"
+    if isinstance(markup, bytes):
+        pattern = pattern.encode()
+    for n, match in enumerate(re.finditer(pattern, markup)):
+        if n == limit:
+            return markup[:match.start()]
+    return markup
+
+
+def _parse_cut(parse_rows, text, tag, cls, limit):
+    """Internal method for parsers which skip some rows, it parses the page cut short by _cut_rows and then the
+    whole page if rows were skipped and fewer than limit results were found
+
+    Args:
+        parse_rows: a function (text, limit) which parses the rows on a page in to a list of results
+        text (str | bytes): the page
+        tag (str): the name of the tag each row starts with
+        cls (str): the class the tag of each row has
+        limit (int): how many results are needed, 0 or less means every result
+    Returns:
+        the list of results
+    """
+    cut = _cut_rows(text, tag, cls, limit)
+    results = parse_rows(cut, limit)
+    if len(results) < limit and len(cut) < len(text):
+        results = parse_rows(text, limit)
+    return results
+
+
+async def _single_flight(key, func, *args, **kwargs):
+    """Internal method which makes concurrent calls with the same key share a single call to func
+
+    The first caller starts func(*args, **kwargs), any caller with the same key that arrives before it
+    finishes waits for that call instead of starting its own. Every caller receives the same result,
+    so it shouldn't be modified.
+
+    Args:
+        key (tuple): identifies the call, calls with equal keys must be interchangeable
+        func (coroutine function): the function to call
+    Returns:
+        the result of func(*args, **kwargs)
+    """
+    if not STEAM_COALESCE:
+        return await func(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    future = _in_flight.get(key)
+    if future is not None and future.get_loop() is loop:
+        _coalesce_stats["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    _coalesce_stats["calls"] += 1
+    future = asyncio.ensure_future(func(*args, **kwargs))
+    _in_flight[key] = future
+
+    def done(fut):
+        if _in_flight.get(key) is fut:
+            del _in_flight[key]
+        if not fut.cancelled():
+            fut.exception()  # marks the exception as retrieved in case every caller was cancelled
+
+    future.add_done_callback(done)
+    # shielded so that one caller being cancelled doesn't cancel the call for everyone else
+    return await asyncio.shield(future)
+
+
+async def _fetch(url, timeout=10, fmt="text", headers=None):
+    """Internal method which performs a GET request using the shared session,
+    identical requests made at the same time share one request
+
+    Args:
+        url (str): the url to request
+        timeout (int, optional): the amount of time before aiohttp raises a timeout error
+        fmt (str, optional): how to read the response body, either "json", "text" or "read" (raw bytes)
+        headers (dict, optional): extra headers to send with the request
+    Returns:
+        the response body, read according to fmt
+    """
+    key = ("fetch", url, fmt, tuple(sorted(headers.items())) if headers else None)
+    return await _single_flight(key, _fetch_uncoalesced, url, timeout=timeout, fmt=fmt, headers=headers)
+
+
+async def _fetch_uncoalesced(url, timeout=10, fmt="text", headers=None):
+    """Internal method which performs a GET request using the shared session, see _fetch.
+    Every request waits for its host's rate limit, and is retried if the host responds with 429 or 503
+
+    Raises:
+        SteamRateLimited: if the host still responded with 429 or 503 after STEAM_RATE_RETRIES retries
+    """
+    session = await startup()
+    retries = max(STEAM_RATE_RETRIES, 0)  # a negative STEAM_RATE_RETRIES still makes the request once
+    for attempt in range(retries + 1):
+        bucket = await _throttle(url)
+        async with session.get(url, headers=headers, timeout=timeout) as resp:
+            if resp.status in (429, 503):
+                retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+                if bucket is not None:
+                    bucket.throttle(retry_after)
+                elif attempt < retries:
+                    await asyncio.sleep(retry_after if retry_after is not None else 2 ** attempt)
+                continue
+            if bucket is not None:
+                bucket.succeeded()
+            if fmt == "json":
+                return await resp.json()
+            elif fmt == "read":
+                return await resp.read()
+            return await resp.text()
+    raise SteamRateLimited("%s responded with %s" % (parse.urlsplit(url).hostname, resp.status))
+
+
+async def get_rates(timeout=10):
+    """Gets the table of exchange rates, the table is only fetched again once it's STEAM_RATES_TTL seconds old
+
+    Args:
+        timeout (int, optional): The time in seconds aiohttp will take to timeout the request
+    Returns:
+        dict: maps currency codes to their exchange rate relative to the table's base currency
+    """
+    if _rates is not None and _rates[0] > time.monotonic():
+        return _rates[1]
+    return await _single_flight(("rates",), _load_rates, timeout)
+
+
+async def _load_rates(timeout):
+    """Internal method which fetches the table of exchange rates, see get_rates"""
+    global _rates
+    data = await _fetch("https://api.fixer.io/latest", timeout=timeout, fmt="json")
+    rates = dict(data["rates"])
+    rates[data.get("base", "EUR")] = 1
+    _rates = (time.monotonic() + STEAM_RATES_TTL, rates)
+    return rates
+
+
+def _convert(amount, from_curr, to_curr, rates):
+    """Internal method to convert an amount of money using a table of exchange rates (see get_rates)
+
+    Raises:
+        KeyError: if either currency isn't in the table
+    """
+    return round(amount / rates[from_curr] * rates[to_curr], 2)
+
+
+def start_rates_refresh(interval=None):
+    """Starts refreshing the table of exchange rates in the background, so that conversions never wait on a request
+
+    Args:
+        interval (int, optional): how often in seconds the table is refreshed, defaults to just under STEAM_RATES_TTL
+    """
+    global _rates_task
+    if _rates_task is None or _rates_task.done():
+        _rates_task = asyncio.ensure_future(_refresh_rates(interval))
+
+
+async def stop_rates_refresh():
+    """Stops refreshing the table of exchange rates in the background"""
+    global _rates_task
+    if _rates_task is not None and not _rates_task.done():
+        _rates_task.cancel()
+        try:
+            await _rates_task
+        except asyncio.CancelledError:
+            pass
+    _rates_task = None
+
+
+async def _refresh_rates(interval):
+    """Internal method which keeps refreshing the table of exchange rates, see start_rates_refresh"""
+    while True:
+        try:
+            await _single_flight(("rates",), _load_rates, 10)
+        except Exception:
+            if STEAM_PRINTING:
+                print("failed to refresh exchange rates")
+        await asyncio.sleep(interval or STEAM_RATES_TTL * 0.9)
+
+
 async def exchange(amount, from_curr, to_curr, timeout=10):
     """Converts an amount of money from one currency to another
 
@@ -176,17 +1278,48 @@ async def exchange(amount, from_curr, to_curr, timeout=10):
         timeout (int, optional): The time in seconds aiohttp will take to timeout the request
     Returns:
         float: the converted amount of money to 2 d.p., or the original amount of the conversion failed.
+    Raises:
+        SteamRateLimited: if the exchange rates host kept rate limiting us
     """
     try:
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            resp = await session.get("https://api.fixer.io/latest?symbols=" + from_curr + "," + to_curr, timeout=timeout)
-            data = await resp.json()
-            if "rates" in data:
-                return int((amount / data["rates"][from_curr]) * data["rates"][to_curr] * 100)/100
-    except:
+        rates = await get_rates(timeout=timeout)
+        return _convert(amount, from_curr, to_curr, rates)
+    except SteamRateLimited:
+        raise
+    except Exception:
         return amount
 
 
+async def convert_many(results, currency, currency_symbol=None, timeout=10):
+    """Converts the prices of a list of results to another currency, only fetching the exchange rates once
+
+    Args:
+        results (list): the results to convert, any which don't have a price to convert are skipped
+        currency (str): The currency code (e.g USD or GBP) to convert the prices to
+        currency_symbol (str, optional): The currency symbol to add to the start of the prices, defaults to
+            the symbol CURRENCY_MAP has for currency
+        timeout (int, optional): The time in seconds aiohttp will take to timeout the request
+    Returns:
+        the list of results
+    Raises:
+        SteamRateLimited: if the exchange rates host kept rate limiting us
+    """
+    if currency_symbol is None:
+        currency_symbol = {code: symbol for symbol, code in CURRENCY_MAP.items()}.get(currency, currency)
+    try:
+        rates = await get_rates(timeout=timeout)
+    except SteamRateLimited:
+        raise
+    except Exception:
+        if STEAM_PRINTING:
+            print("failed to get exchange rates")
+        return results
+    for result in results:
+        if hasattr(result, "convert_price"):
+            result.convert_price(rates, currency, currency_symbol)
+    return results
+
+
 def is_integer(x):
     try:
         int(x)
@@ -250,17 +1383,37 @@ class GamePageResult:
             if pricesoup is not None:
                 self.discountPrice = pricesoup.get_text().replace(" ", "").replace("\n", "").replace("\r", "").replace("\t", "").replace("(", "").replace(")", "").replace("-", "")
 
-    async     def update_price(self, currency, currency_symbol):
+    @_awaited
+    async def update_price(self, currency="GBP", currency_symbol="£"):
         """Attempts to convert the price to GBP
 
         Args:
+            currency (str, optional): The currency code (e.g USD or GBP) to convert the price to
+            currency_symbol (str, optional): The currency symbol to add to the start of the price
+            """
+        if currency != "GBP":
+            try:
+                rates = await get_rates()
+            except SteamRateLimited:
+                raise
+            except Exception:
+                if STEAM_PRINTING:
+                    print("failed to get exchange rates")
+                return
+            self.convert_price(rates, currency, currency_symbol)
+
+    def convert_price(self, rates, currency, currency_symbol):
+        """Converts the price from GBP using a table of exchange rates, see get_rates and convert_many
+
+        Args:
+            rates (dict): The table of exchange rates
             currency (str): The currency code (e.g USD or GBP) to convert the price to
             currency_symbol (str): The currency symbol to add to the start of the price
             """
         if currency != "GBP":
             try:
                 if self.price != "???" and self.price != "" and self.price != "Free to Play":
-                    rawprice = await exchange(float(self.price[1:]), "GBP", currency)
+                    rawprice = _convert(float(self.price[1:]), "GBP", currency, rates)
                     self.price = currency_symbol + str(rawprice)
             except:
                 if STEAM_PRINTING:
@@ -343,17 +1496,37 @@ class GameResult:
         else:
             return self.discountPrice + " (" + self.discount + ")"
 
-    async def update_price(self, currency, currency_symbol):
+    @_awaited
+    async def update_price(self, currency="GBP", currency_symbol="£"):
         """Attempts to convert the price to GBP
 
         Args:
+            currency (str, optional): The currency code (e.g USD or GBP) to convert the price to
+            currency_symbol (str, optional): The currency symbol to add to the start of the price
+            """
+        if currency != "GBP":
+            try:
+                rates = await get_rates()
+            except SteamRateLimited:
+                raise
+            except Exception:
+                if STEAM_PRINTING:
+                    print("failed to get exchange rates")
+                return
+            self.convert_price(rates, currency, currency_symbol)
+
+    def convert_price(self, rates, currency, currency_symbol):
+        """Converts the price from GBP using a table of exchange rates, see get_rates and convert_many
+
+        Args:
+            rates (dict): The table of exchange rates
             currency (str): The currency code (e.g USD or GBP) to convert the price to
             currency_symbol (str): The currency symbol to add to the start of the price
             """
         if currency != "GBP":
             try:
                 if self.price != "???" and self.price != "" and self.price != "Free to Play":
-                    rawprice = await exchange(float(self.price[1:]), "GBP", currency)
+                    rawprice = _convert(float(self.price[1:]), "GBP", currency, rates)
                     self.price = currency_symbol + str(rawprice)
             except:
                 if STEAM_PRINTING:
@@ -516,21 +1689,41 @@ class TopResult:
         else:
             return self.discountPrice + " (" + self.discount + ")"
 
-    async     def update_price(self, currency, currency_symbol):
+    @_awaited
+    async def update_price(self, currency="GBP", currency_symbol="£"):
         """Attempts to convert the price to GBP
 
         Args:
+            currency (str, optional): The currency code (e.g USD or GBP) to convert the price to
+            currency_symbol (str, optional): The currency symbol to add to the start of the price
+            """
+        if currency != "GBP":
+            try:
+                rates = await get_rates()
+            except SteamRateLimited:
+                raise
+            except Exception:
+                if STEAM_PRINTING:
+                    print("failed to get exchange rates")
+                return
+            self.convert_price(rates, currency, currency_symbol)
+
+    def convert_price(self, rates, currency, currency_symbol):
+        """Converts the price from GBP using a table of exchange rates, see get_rates and convert_many
+
+        Args:
+            rates (dict): The table of exchange rates
             currency (str): The currency code (e.g USD or GBP) to convert the price to
             currency_symbol (str): The currency symbol to add to the start of the price
             """
         if currency != "GBP":
             try:
                 if self.price != "???" and self.price != "" and self.price != "Free to Play":
-                    rawprice = await exchange(float(self.price[1:]), "GBP", currency)
+                    rawprice = _convert(float(self.price[1:]), "GBP", currency, rates)
                     self.price = currency_symbol + str(rawprice)
 
                 if self.discountPrice != "???" and self.price != "":
-                    rawdiscountprice = await exchange(float(self.discountPrice[1:]), "GBP", currency)
+                    rawdiscountprice = _convert(float(self.discountPrice[1:]), "GBP", currency, rates)
                     self.discountPrice = currency_symbol + str(rawdiscountprice)
             except:
                 if STEAM_PRINTING:
@@ -579,12 +1772,48 @@ class SteamSaleResult(TopResult):
         self.reviewLong = "???"
         self.released = "???"
 
+    @_awaited
     async def get_title(self, cc="gb", timeout=10):
-        async with aiohttp.ClientSession() as session:
-            resp = await session.get("https://store.steampowered.com/api/appdetails/?appids=" + self.id, timeout=timeout)
-            data = await resp.json()
+        self.title = await get_game_name_by_id(self.id, timeout=timeout)
+
+
+async def get_sale_titles(results, timeout=10, concurrency=None):
+    """Finds the titles of many SteamSaleResults at once, instead of calling get_title on each of them.
+    Each app's title is only looked up once however many results share it, titles in the local app index
+    or the appdetails cache don't need a request and the rest are requested concurrently
+
+    Args:
+        results (list): a list of results, any which aren't SteamSaleResults or already have a title are skipped
+        timeout (int, optional): the amount of time before aiohttp raises a timeout error
+        concurrency (int, optional): the most requests to have in flight at once, defaults to STEAM_SALES_CONCURRENCY
+    Returns:
+        the same list of results
+    Raises:
+        SteamRateLimited: if the store kept rate limiting us, the titles which were found are still set
+    """
+    waiting = collections.OrderedDict()  # maps appids to the results waiting on their title
+    for result in results:
+        if isinstance(result, SteamSaleResult) and result.title == "???" and result.id is not None:
+            waiting.setdefault(result.id, []).append(result)
+
+    semaphore = asyncio.Semaphore(concurrency or STEAM_SALES_CONCURRENCY)
+
+    async def resolve(appid):
+        async with semaphore:
+            try:
+                title = await get_game_name_by_id(appid, timeout=timeout)
+            except SteamRateLimited:
+                raise
+            except Exception:
+                if STEAM_PRINTING:
+                    print("failed to find the title of %s" % appid)
+                return
+        for result in waiting[appid]:
+            result.title = title
 
-            self.title = parse.unquote(data[self.id]["data"]["name"])
+    # get_game_name_by_id checks the app index before requesting anything, so only the unknown apps cost a request
+    await asyncio.gather(*[resolve(appid) for appid in waiting])
+    return results
 
 class UserResult:
     """Class containing information about a specific user"""
@@ -654,6 +1883,14 @@ class UserGame:
         else:
             return start % self.format_playtime(self.playtime_forever)
 
+    def single_line_format(self):
+        """Converts the object to single line format, the same as get_playtime_string with its default arguments
+
+        Returns:
+            A string representing this object
+        """
+        return self.get_playtime_string()
+
 
 class UserLibrary:
     """Class containing information about a set of games in the users library"""
@@ -664,11 +1901,14 @@ class UserLibrary:
             ugame = UserGame(game)
             self.games[ugame.id] = ugame
 
-    def get_game_list(self, limit=10, start="%s hours on record", end=" (%s hours in the last 2 weeks)"):
+    def get_game_list(self, limit=10, start="%s hours on record", end=" (%s hours in the last 2 weeks)", numbered=True):
         """Converts the game list to a list of singe line formatted strings
 
         Args:
             limit (int): how many of the games to get, in decreasing order of total playtime
+            start (str, optional): the format of the total playtime, see UserGame.get_playtime_string
+            end (str, optional): the format of the playtime in the last 2 weeks, see UserGame.get_playtime_string
+            numbered (bool, optional): whether to start each line with its position in the list
         Returns:
             a list of strings representing the user's most played games
             """
@@ -683,7 +1923,9 @@ class UserLibrary:
         longest_name += 3
         max_i_len = len(str(len(pairs)))
         for i, pair in enumerate(pairs):
-            final[i] = " " * (max_i_len - len(str(i+1))) + str(i+1) + ". " + pair[0] + " " * (longest_name - len(pair[0])) + pair[1]
+            final[i] = pair[0] + " " * (longest_name - len(pair[0])) + pair[1]
+            if numbered:
+                final[i] = " " * (max_i_len - len(str(i+1))) + str(i+1) + ". " + final[i]
         return final
 
 
@@ -873,25 +2115,21 @@ class SteamGame:
 
 class ItemResult:
     """Class containing information about an item on the steam market"""
-    def __init__(self, soup):
+    def __init__(self, rawprice, icon_url=None, asset=None, history=None):
         """
 
         Args:
-            soup (BeautifulSoup): the soup of the item's store page
+            rawprice (str): the item's price as it's shown on the market (e.g. "£1.23"), or None if it has no price
+            icon_url (str, optional): the item's icon, used if asset is None
+            asset (dict, optional): the item's description from the g_rgAssets of its listings page
+            history (PriceHistory, optional): the item's price history from its listings page
         """
-        price = soup.find("span", {"class": "market_listing_price_with_publisher_fee_only"})
+        self.history = history
         self.price = "???"
+        self.currency = "???"
         self.game = "???"
-        if price is not None:
-            rawprice = price.get_text().replace("\n", "").replace("\t", "").replace("\r", "")
-            before = ""
-            after = ""
-            while len(rawprice) > 0 and rawprice[0] not in "0123456789.,":
-                before += rawprice[0]
-                rawprice = rawprice[1:]
-            while len(rawprice) > 0 and rawprice[-1] not in "0123456789.,":
-                after = rawprice[-1] + after
-                rawprice = rawprice[:-1]
+        if rawprice is not None:
+            before, rawprice, after = _PRICE_RE.match(rawprice.replace("\n", "").replace("\t", "").replace("\r", "")).groups()
             before = before.replace(" ", "")
             after = after.replace(" ", "")
 
@@ -908,41 +2146,21 @@ class ItemResult:
         elif STEAM_PRINTING:
             print("failed to find price")
 
-        text = str(soup)
         self.icon = "???"
-        iconindex = text.find('"icon_url":')
-        if iconindex > 0:
-            iconurl = text[iconindex+len('"icon_url":'):text.find(',', iconindex)].replace(" ", "").replace('"', "")
-            self.icon = "https://steamcommunity-a.akamaihd.net/economy/image/" + iconurl
+        if icon_url is not None:
+            self.icon = "https://steamcommunity-a.akamaihd.net/economy/image/" + icon_url
         elif STEAM_PRINTING:
             print("failed to find icon")
 
-        index = text.find("var g_rgAssets")
-        nindex = text.find("\n", index)
-        jsontext = text[index:nindex]
-        while jsontext[0] != "{" and jsontext[0] != "[":
-            jsontext = jsontext[1:]
-        while jsontext[-1] != "}" and jsontext[-1] != "]":
-            jsontext = jsontext[:-1]
-
-
-        try:
-            data = json.loads(jsontext)
-            raw = {}
-            for k1 in data:
-                for k2 in data[k1]:
-                    for k3 in data[k1][k2]:
-                        if "tradable" in data[k1][k2][k3] and data[k1][k2][k3]["tradable"] == 1:
-                            raw = data[k1][k2][k3]
-                            break
-
-            self.actions = raw.get("actions", [])
-            self.name = raw.get("name", "???")
-            self.gameIcon = raw.get("app_icon", "???")
-            self.icon = "https://steamcommunity-a.akamaihd.net/economy/image/" + raw.get("icon_url", "???")
-            self.type = raw.get("type", "???")
-            self.desc = [BeautifulSoup(x.get("value", ""), "html.parser").get_text() for x in raw.get("descriptions", [])]
-        except:
+        if asset is not None:
+            self.actions = asset.get("actions", [])
+            self.name = asset.get("name", "???")
+            self.gameIcon = asset.get("app_icon", "???")
+            if "icon_url" in asset:
+                self.icon = "https://steamcommunity-a.akamaihd.net/economy/image/" + asset["icon_url"]
+            self.type = asset.get("type", "???")
+            self.desc = [_strip_tags(x.get("value", "")) for x in asset.get("descriptions", [])]
+        else:
             self.actions = []
             self.name = "???"
             self.gameIcon = "???"
@@ -952,135 +2170,503 @@ class ItemResult:
             if STEAM_PRINTING:
                 print("failed to load market data")
 
-    async def update_price(self, currency, currency_symbol):
+    @_awaited
+    async def update_price(self, currency="GBP", currency_symbol="£"):
         """Attempts to convert the price to GBP
 
         Args:
+            currency (str, optional): The currency code (e.g USD or GBP) to convert the price to
+            currency_symbol (str, optional): The currency symbol to add to the start of the price
+            """
+        rates = {}
+        if self.currency != currency:
+            try:
+                rates = await get_rates()
+            except SteamRateLimited:
+                raise
+            except Exception:
+                if STEAM_PRINTING:
+                    print("failed to get exchange rates")
+                return
+        self.convert_price(rates, currency, currency_symbol)
+
+    def convert_price(self, rates, currency, currency_symbol):
+        """Converts the price using a table of exchange rates, see get_rates and convert_many.
+        A price which is already in currency only has the symbol added, so rates can be empty
+
+        Args:
+            rates (dict): The table of exchange rates
             currency (str): The currency code (e.g USD or GBP) to convert the price to
             currency_symbol (str): The currency symbol to add to the start of the price
             """
+        if self.currency == currency:
+            self.price = currency_symbol + self.price
+            return
         try:
-            rawprice = await exchange(float(self.price.replace(",", ".")), self.currency, currency)
+            rawprice = _convert(float(self.price.replace(",", ".")), self.currency, currency, rates)
             self.price = currency_symbol + str(rawprice)
         except:
             if STEAM_PRINTING:
                 print("failed to convert currency (" + self.currency + ")")
 
 
-async def check_game_sales(checks, old, optional_test=None, timeout=120):
+_RESAMPLE_METHODS = ("mean", "min", "max", "first", "last")  # the ways PriceHistory.resample can combine prices
+
+
+def _check_window(window):
+    """Internal method which raises a ValueError if a PriceHistory rolling window is less than 1"""
+    if window < 1:
+        raise ValueError("window must be at least 1, not %s" % window)
+
+
+class PriceHistory:
+    """Class containing an item's price history from the market, kept as parallel arrays instead of lists of tuples
+    so that the histories of thousands of items take little memory.
+
+    rolling_mean, rolling_min, rolling_max and resample are plain Python loops over the arrays, each a single pass
+    but not vectorized, for heavy analysis use numpy.frombuffer(history.prices) to get numpy arrays without copying"""
+    def __init__(self, timestamps=None, prices=None, volumes=None):
+        """
+
+        Args:
+            timestamps (array.array, optional): when each sale happened, in seconds since the epoch (int64)
+            prices (array.array, optional): the median price of each sale, in the market's currency (float)
+            volumes (array.array, optional): how many of the item were sold (int32)
+        """
+        self.timestamps = timestamps if timestamps is not None else array.array("q")
+        self.prices = prices if prices is not None else array.array("d")
+        self.volumes = volumes if volumes is not None else array.array("i")
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def rolling_mean(self, window):
+        """Gets the mean price over every run of window points, in one Python loop keeping a running sum
+
+        Args:
+            window (int): how many points each mean is taken over, at least 1
+        Returns:
+            array.array: the means (float), one for each point from the window'th point on
+        Raises:
+            ValueError: if window is less than 1
+        """
+        _check_window(window)
+        means = array.array("d")
+        total = 0.0
+        prices = self.prices
+        for i in range(len(prices)):
+            total += prices[i]
+            if i >= window:
+                total -= prices[i - window]
+            if i >= window - 1:
+                means.append(total / window)
+        return means
+
+    def rolling_min(self, window):
+        """Gets the lowest price in every run of window points, see rolling_mean"""
+        return self._rolling_extreme(window, operator.le)
+
+    def rolling_max(self, window):
+        """Gets the highest price in every run of window points, see rolling_mean"""
+        return self._rolling_extreme(window, operator.ge)
+
+    def _rolling_extreme(self, window, keep):
+        """Internal method which finds the extreme of every window in one Python loop, using a monotonic queue of indexes
+
+        Args:
+            window (int): how many points each window contains
+            keep: compares two prices, True if the first should stay in the queue ahead of the second
+        Returns:
+            array.array: the extremes (float)
+        """
+        _check_window(window)
+        extremes = array.array("d")
+        queue = collections.deque()
+        prices = self.prices
+        for i in range(len(prices)):
+            while queue and not keep(prices[queue[-1]], prices[i]):
+                queue.pop()
+            queue.append(i)
+            if queue[0] <= i - window:
+                queue.popleft()
+            if i >= window - 1:
+                extremes.append(prices[queue[0]])
+        return extremes
+
+    def resample(self, interval, how="mean"):
+        """Groups the history in to buckets of the same length, e.g. interval=86400 for daily prices, in one Python loop
+
+        Args:
+            interval (int): the length of each bucket in seconds, more than 0
+            how (str, optional): how to combine the prices in a bucket, "mean" (weighted by volume), "min",
+                "max", "first" or "last"
+        Returns:
+            PriceHistory: the resampled history, with the start of each bucket as its timestamp
+                and the total volume sold in each bucket
+        Raises:
+            ValueError: if interval isn't more than 0 or how isn't one of the above
+        """
+        if interval <= 0:
+            raise ValueError("interval must be more than 0, not %s" % interval)
+        if how not in _RESAMPLE_METHODS:
+            raise ValueError("how must be one of %s, not %r" % (", ".join(_RESAMPLE_METHODS), how))
+        resampled = PriceHistory()
+        bucket = None
+        price = weight = volume = 0
+        for timestamp, p, v in zip(self.timestamps, self.prices, self.volumes):
+            start = timestamp - timestamp % interval
+            if start != bucket:
+                if bucket is not None:
+                    resampled._append(bucket, price / weight if how == "mean" else price, volume)
+                bucket, volume, weight = start, 0, 0
+                price = 0.0 if how == "mean" else p
+            if how == "mean":
+                price += p * max(v, 1)
+                weight += max(v, 1)
+            elif how == "min":
+                price = min(price, p)
+            elif how == "max":
+                price = max(price, p)
+            elif how == "last":
+                price = p
+            volume += v
+        if bucket is not None:
+            resampled._append(bucket, price / weight if how == "mean" else price, volume)
+        return resampled
+
+    def _append(self, timestamp, price, volume):
+        """Internal method which adds a point to the end of the history"""
+        self.timestamps.append(timestamp)
+        self.prices.append(price)
+        self.volumes.append(volume)
+
+
+async def check_game_sales(checks, old, optional_test=None, timeout=120, concurrency=None):
     """
 
     :param checks: a list of tuples (gameid, percent, cc, other...)
     :param old: a dict of games found last time {gameid: percent}
+    :param optional_test: a dict of already known results {gameid: (price_overview, name) or None}, these aren't requested.
+        A game checked in several ccs is compared with old using its price in the cc of its first check
+    :param concurrency: the most appdetails requests to have in flight at once, defaults to STEAM_SALES_CONCURRENCY
     :return: a list of tuples (gameid, check_percent, old_percent, price_overview, name, other...)
     """
-    async with aiohttp.ClientSession() as session:
-        cached = optional_test or {}
+    cached = optional_test or {}
+    if STEAM_PRINTING:
         print("useing optional test: %s" % cached)
-        results, new_old = [], {}
-
         print("using checks: %s" % str(checks))
 
-        for check in checks:
+    results, new_old = [], {}
+    async for result in iter_game_sales(checks, old, cached=cached, timeout=timeout, concurrency=concurrency):
+        results.append(result)
+    for gameid in cached:
+        if cached[gameid] is not None:
+            new_old[gameid] = float(cached[gameid][0]["discount_percent"])
+        else:
+            new_old[gameid] = 0
+    return results, new_old
+
+
+async def iter_game_sales(checks, old, cached=None, timeout=120, concurrency=None):
+    """Checks games for sales concurrently, yielding each result as soon as its check completes.
+    The prices of up to STEAM_APPDETAILS_BATCH_SIZE games in the same cc are requested at once (see get_price_overviews),
+    and each (gameid, cc) pair is only requested once, however many checks contain it.
+
+    Args:
+        checks (list): a list of tuples (gameid, percent, cc, other...)
+        old (dict): a dict of games found last time {gameid: percent}
+        cached (dict, optional): a dict of known results {gameid: (price_overview, name) or None}, gameids in it
+            aren't requested and the result of every request is added to it. A game checked in several ccs is only
+            added with its price in the cc of its first check, so it's always compared in the same store.
+            name is None for games whose name wasn't needed, it's found once they go on sale
+        timeout (int, optional): the amount of time before aiohttp raises a timeout error
+        concurrency (int, optional): the most requests to have in flight at once, defaults to STEAM_SALES_CONCURRENCY
+    Yields:
+        lists (gameid, check_percent, old_percent, price_overview, name, other...) for the games on sale
+    Raises:
+        SteamRateLimited: if the store kept rate limiting us, the checks which haven't been yielded yet are cancelled
+    """
+    cached = {} if cached is None else cached
+    semaphore = asyncio.Semaphore(concurrency or STEAM_SALES_CONCURRENCY)
+    names = {}  # maps gameids to the task finding their name, so each game's name is only requested once
+
+    async def named(gameid, cc, price, results):
+        # only games which are actually on sale are worth the extra request for their name
+        if results and price[1] is None:
+            if gameid not in names:
+                names[gameid] = asyncio.ensure_future(_find_app_name(gameid, cc, semaphore, timeout))
+            name = await asyncio.shield(names[gameid])
+            for result in results:
+                result[4] = name
+            if name != "???":
+                price = (price[0], name)
+        return gameid, price, results
+
+    waiting = collections.OrderedDict()  # maps (gameid, cc) to the checks waiting on it
+    unnamed = []  # the games in cached which are on sale, but whose name hasn't been found yet
+    for check in checks:
+        if check[0] in cached:
+            result = _check_game_sale(check, old, cached[check[0]])
+            if result is not None and result[4] is None:
+                unnamed.append(named(check[0], check[2], cached[check[0]], [result]))
+            elif result is not None:
+                yield result
+        else:
+            waiting.setdefault((check[0], check[2]), []).append(check)
+
+    batches = collections.OrderedDict()  # maps each cc to the gameids which need its prices
+    first_cc = {}  # maps gameids to the cc of their first check, which is the only price of theirs added to cached
+    for gameid, cc in waiting:
+        batches.setdefault(cc, []).append(gameid)
+        first_cc.setdefault(gameid, cc)
+
+    async def request(cc, gameids):
+        async with semaphore:
             try:
-                if check[0] not in cached:
-                    resp = await session.get("https://store.steampowered.com/api/appdetails/?appids=" + check[0] + "&cc=" + check[2], timeout=timeout)
-                    json = await resp.json()
-
-                    if not isinstance(json, dict):
-                        print("failed to find percent for %s" % check[0])
-                        continue
-
-                    if json[check[0]]["success"]:
-                        if "price_overview" not in json[check[0]]["data"]:
-                            cached[check[0]] = None
-                            continue
-                        price_overview = json[check[0]]["data"]["price_overview"]
-                        cached[check[0]] = (price_overview, json[check[0]]["data"]["name"])
-                    else:
-                        cached[check[0]] = None
-
-                    resp.close()
-
-                if cached[check[0]] is not None:
-                    result = cached[check[0]]
-                    print(result)
-                    old_percent = float(old.get(check[0], 0))
-                    new_percent = float(result[0]["discount_percent"])
-                    required_percent = float(check[1])
-                    if new_percent >= required_percent and new_percent != old_percent:
-                        results.append([check[0], float(check[1]), old_percent, result[0], result[1]] + list(check[3:]))
-            except:
-                print("[WARNING] failed to process check %s" % check)
-                pass
-        for gameid in cached:
-            if cached[gameid] is not None:
-                new_old[gameid] = float(cached[gameid][0]["discount_percent"])
-            else:
-                new_old[gameid] = 0
-        return results, new_old
+                prices = await get_price_overviews(gameids, cc=cc, timeout=timeout)
+            except SteamRateLimited:
+                raise
+            except Exception:
+                if STEAM_PRINTING:
+                    print("[WARNING] failed to process checks for %s in %s" % (", ".join(gameids), cc))
+                return []
+
+        found = []
+        for gameid, overview in prices.items():
+            price = None
+            if overview is not None:
+                price = (overview, app_index.get_title(gameid) if app_index is not None else None)
+            results = [_check_game_sale(check, old, price) for check in waiting[(gameid, cc)]]
+            found.append(named(gameid, cc, price, [result for result in results if result is not None]))
+        return [game + (cc,) for game in await asyncio.gather(*found)]
+
+    async def name_cached():
+        return [game + (None,) for game in await asyncio.gather(*unnamed)]
+
+    tasks = [asyncio.ensure_future(request(cc, gameids[i:i + STEAM_APPDETAILS_BATCH_SIZE]))
+             for cc, gameids in batches.items()
+             for i in range(0, len(gameids), STEAM_APPDETAILS_BATCH_SIZE)]
+    if unnamed:
+        tasks.append(asyncio.ensure_future(name_cached()))
+    try:
+        for task in asyncio.as_completed(tasks):
+            for gameid, price, results, cc in await task:
+                if cc is None or first_cc[gameid] == cc:
+                    cached[gameid] = price
+                for result in results:
+                    yield result
+    finally:
+        for task in tasks + list(names.values()):
+            task.cancel()
+
+
+async def _find_app_name(appid, cc, semaphore, timeout):
+    """Internal method which finds the name of a game on sale, or "???" if it couldn't be found, see iter_game_sales"""
+    async with semaphore:
+        try:
+            return await _get_app_name(appid, cc, timeout)
+        except SteamRateLimited:
+            raise
+        except Exception:
+            return "???"
+
+
+async def _get_app_name(appid, cc, timeout):
+    """Internal method which gets an app's name from any cached appdetails response, or else from the much smaller
+    basic form of appdetails, see iter_game_sales"""
+    for key in ((appid, cc), (appid, None)):
+        details = store_cache.get("appdetails", key)
+        if details is not None and details.get("success"):
+            return parse.unquote(details["data"]["name"])
+    details = await get_app_details(appid, cc=cc, timeout=timeout, filters="basic")
+    return parse.unquote(details["data"]["name"])
+
+
+def _check_game_sale(check, old, price):
+    """Internal method which checks whether a game's price passes a check, see iter_game_sales
+
+    Args:
+        check (tuple): the check (gameid, percent, cc, other...)
+        old (dict): a dict of games found last time {gameid: percent}
+        price (tuple): the game's (price_overview, name), or None if it has no price
+    Returns:
+        a list (gameid, check_percent, old_percent, price_overview, name, other...) or None if the check didn't pass
+    """
+    if price is None:
+        return None
+    try:
+        old_percent = float(old.get(check[0], 0))
+        new_percent = float(price[0]["discount_percent"])
+        required_percent = float(check[1])
+        if new_percent >= required_percent and new_percent != old_percent:
+            return [check[0], float(check[1]), old_percent, price[0], price[1]] + list(check[3:])
+    except (KeyError, TypeError, ValueError):
+        if STEAM_PRINTING:
+            print("[WARNING] failed to process check %s" % (check,))
+    return None
+
+
+async def get_app_details(appid, cc=None, timeout=10, filters=None):
+    """Gets an app's full appdetails response, which is cached for STEAM_APPDETAILS_TTL seconds per (appid, cc)
+    so every function which needs some part of it shares the same request
+
+    Args:
+        appid (str): the app's id
+        cc (str, optional): the country code to get prices in, defaults to steam's choice based on your location
+        timeout (int, optional): the amount of time before aiohttp raises a timeout error
+        filters (str, optional): only get these fields of the response (e.g. "basic"), which is much smaller,
+            filtered responses are cached separately from full ones
+    Returns:
+        dict: the app's response {"success": bool, "data": dict}
+    """
+    key = (appid, cc) if filters is None else (appid, cc, filters)
+    details = store_cache.get("appdetails", key)
+    if details is not None:
+        return details
+
+    url = "https://store.steampowered.com/api/appdetails/?appids=" + appid
+    if cc is not None:
+        url += "&cc=" + cc
+    if filters is not None:
+        url += "&filters=" + filters
+    data = await _fetch(url, timeout=timeout, fmt="json")
+    if not isinstance(data, dict) or appid not in data:
+        raise ValueError("failed to get the details of %s" % appid)
+
+    details = data[appid]
+    if STEAM_APPDETAILS_TTL > 0:
+        store_cache.set("appdetails", key, details, ttl=STEAM_APPDETAILS_TTL)
+    return details
+
+
+async def get_price_overviews(appids, cc="gb", timeout=10):
+    """Gets the prices of many apps, appdetails only allows several appids in one request when it's filtered to
+    price_overview so up to STEAM_APPDETAILS_BATCH_SIZE apps are requested at once.
+    Prices are cached for STEAM_APPDETAILS_TTL seconds per (appid, cc), and any full appdetails response
+    already cached by get_app_details is used instead of requesting the price again
+
+    Args:
+        appids (list): the ids of the apps
+        cc (str, optional): the country code to get prices in
+        timeout (int, optional): the amount of time before aiohttp raises a timeout error
+    Returns:
+        dict: maps each appid to its price_overview (dict), or None if the app has no price
+    """
+    prices, missing = {}, []
+    for appid in dict.fromkeys(appids):
+        price = _cached_price_overview(appid, cc)
+        if price is _MISSING:
+            missing.append(appid)
+        else:
+            prices[appid] = price
+
+    batches = [missing[i:i + STEAM_APPDETAILS_BATCH_SIZE] for i in range(0, len(missing), STEAM_APPDETAILS_BATCH_SIZE)]
+    for batch_prices in await asyncio.gather(*[_load_price_overviews(batch, cc, timeout) for batch in batches]):
+        prices.update(batch_prices)
+    return prices
+
+
+def _cached_price_overview(appid, cc):
+    """Internal method which finds an app's price in the cache, see get_price_overviews
+
+    Returns:
+        the app's price_overview (dict), None if it has no price or _MISSING if it isn't cached
+    """
+    price = store_cache.get("price_overview", (appid, cc), _MISSING)
+    if price is _MISSING:
+        details = store_cache.get("appdetails", (appid, cc))
+        if details is not None:
+            price = _price_overview_from_details(details)
+    return price
+
+
+def _price_overview_from_details(details):
+    """Internal method which gets the price_overview out of an app's appdetails response, or None if it has no price"""
+    # appdetails returns an empty list instead of a dict when none of the filtered fields exist
+    data = details.get("data") if details.get("success") else None
+    if not isinstance(data, dict):
+        return None
+    return data.get("price_overview")
+
+
+async def _load_price_overviews(appids, cc, timeout):
+    """Internal method which requests the prices of a batch of apps in one request, see get_price_overviews"""
+    data = await _fetch("https://store.steampowered.com/api/appdetails/?appids=" + ",".join(appids) + "&cc=" + cc + "&filters=price_overview", timeout=timeout, fmt="json")
+    if not isinstance(data, dict):
+        raise ValueError("failed to find prices for %s" % ", ".join(appids))
+
+    prices = {}
+    for appid in appids:
+        prices[appid] = _price_overview_from_details(data.get(appid) or {})
+        if STEAM_APPDETAILS_TTL > 0:
+            store_cache.set("price_overview", (appid, cc), prices[appid], ttl=STEAM_APPDETAILS_TTL)
+    return prices
 
 
 async def is_valid_game_id(appid, timeout=10):
     if not isinstance(appid, str):
         return False
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get( "https://store.steampowered.com/api/appdetails/?appids=" + appid, timeout=timeout)
-        json = await resp.json()
+    details = await get_app_details(appid, timeout=timeout)
 
-        return json[appid]["success"]
+    return details["success"]
 
 
-async def get_game_name_by_id(appid, timeout=10):
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/api/appdetails/?appids=" + appid, timeout=timeout)
-        data = await resp.json()
+async def get_game_name_by_id(appid, timeout=10, cc=None):
+    if app_index is not None:
+        title = app_index.get_title(appid)
+        if title is not None:
+            return title
+    details = await get_app_details(appid, cc=cc, timeout=timeout)
 
-        return parse.unquote(data[appid]["data"]["name"])
+    return parse.unquote(details["data"]["name"])
 
 async def get_game_by_id(appid, timeout=10, cc="gb"):
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/app/" + appid + "/?cc=" + cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
+    text = await _fetch("https://store.steampowered.com/app/" + appid + "/?cc=" + cc, timeout=timeout, fmt="read")
+    return await _parse(_parse_game_page, text, appid)
+
 
-        return GamePageResult("https://store.steampowered.com/app/" + appid, appid, soup)
+def _parse_game_page(text, appid):
+    """Internal method which parses a game's store page, see get_game_by_id"""
+    soup = _make_soup(text)
+
+    return GamePageResult("https://store.steampowered.com/app/" + appid, appid, soup)
 
 async def get_recommendations(appid, timeout=10):
     appid = str(appid)
-    similar = []
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/recommended/morelike/app/" + appid, timeout=timeout)
-        text = await resp.text()
-        print(text)
+    text = await _fetch("https://store.steampowered.com/recommended/morelike/app/" + appid, timeout=timeout)
 
-        soup = BeautifulSoup(text, "html.parser")
+    return await _parse(_parse_recommendations, text)
 
 
-        items = soup.find_all("div", {"class": "similar_grid_item"})
+def _parse_recommendations(text):
+    """Internal method which parses the appids out of a game's recommendations page, see get_recommendations"""
+    similar = []
+    soup = _make_soup(text, _class_strainer("div", "similar_grid_item"))
+
+
+    items = soup.find_all("div", {"class": "similar_grid_item"})
+    if STEAM_PRINTING:
         print("found %s items" % len(items))
-        for item in items:
-            subsoup = item.find("div", {"class": "similar_grid_capsule"})
-            if subsoup is not None:
-                similar_id = subsoup.get("data-ds-appid")
-                if similar_id is not None:
-                    similar.append(similar_id)
-                else:
-                    print("failed to find appid")
-            else:
-                print("failed to get item")
+    for item in items:
+        subsoup = item.find("div", {"class": "similar_grid_capsule"})
+        if subsoup is not None:
+            similar_id = subsoup.get("data-ds-appid")
+            if similar_id is not None:
+                similar.append(similar_id)
+            elif STEAM_PRINTING:
+                print("failed to find appid")
+        elif STEAM_PRINTING:
+            print("failed to get item")
     return similar
 
 async def get_user_level(userid, timeout=10, be_specific=False):
     if not is_integer(userid):
         userid = await search_for_userid(userid, timeout=timeout, be_specific=be_specific)
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://api.steampowered.com/IPlayerService/GetSteamLevel/v1/?key=%s&steamid=%s" % (STEAM_KEY, userid), timeout=timeout)
-        data = await resp.json()
+    data = await _fetch("https://api.steampowered.com/IPlayerService/GetSteamLevel/v1/?key=%s&steamid=%s" % (STEAM_KEY, userid), timeout=timeout, fmt="json")
 
-        if "response" in data:
-            return data["response"].get("player_level")
-            return None
+    if "response" in data:
+        return data["response"].get("player_level")
+        return None
 
 async def get_games(term, timeout=10, limit=-1, cc="gb"):
     """Search for a game on steam
@@ -1092,40 +2678,111 @@ async def get_games(term, timeout=10, limit=-1, cc="gb"):
     Returns:
         a list of GameResult objects containing the results
     """
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/search/?term=" + parse.quote(term) + "&cc=" + cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
-
-        subsoup = soup.findAll("div", {"id": "search_result_container"})[0]
-        rawResults = subsoup.findAll("a")
-        results = []
-        n = 0
-        for x in rawResults:
-            if n >= limit > 0:
-                break
-            n += 1
-            cls = x.get("class")
-            if cls is not None and "search_result_row" in cls:
-                gr = GameResult(x)
-                #await gr.update_price(currency, currency_symbol)
-                results.append(gr)
-        return results
+    text = await _fetch("https://store.steampowered.com/search/?term=" + parse.quote(term) + "&cc=" + cc, timeout=timeout, fmt="read")
+    return await _parse(_parse_search_page, text, limit)
+
+
+def _parse_search_page(text, limit):
+    """Internal method which parses the results on a page of the store's search, see get_games"""
+    text = _cut_rows(text, "a", "search_result_row", limit)
+    soup = _make_soup(text, SoupStrainer("div", id="search_result_container"))
+
+    subsoup = soup.findAll("div", {"id": "search_result_container"})[0]
+    rawResults = subsoup.findAll("a")
+    results = []
+    n = 0
+    for x in rawResults:
+        if n >= limit > 0:
+            break
+        n += 1
+        cls = x.get("class")
+        if cls is not None and "search_result_row" in cls:
+            gr = GameResult(x)
+            #await gr.update_price(currency, currency_symbol)
+            results.append(gr)
+    return results
+
+
+async def iter_search(term="", cc="gb", filter=None, specials=False, timeout=10, limit=-1, page_size=None):
+    """Iterates through every result of a store search, fetching pages from the search's infinite scroll endpoint
+    as they're needed. The next page is requested while the current one is being read, and only those two pages
+    are ever held in memory however many results are read
+
+    Args:
+        term (str, optional): the game you want to search for
+        cc (str, optional): the country code of the store to search
+        filter (str, optional): the store's filter for the search (e.g. topsellers, comingsoon)
+        specials (bool, optional): whether or not to only search for games on sale
+        timeout (int, optional): how long aiohttp should wait for each page before raising a timeout error
+        limit (int, optional): how many results to yield, 0 or less means every result
+        page_size (int, optional): how many results to request at once, defaults to STEAM_SEARCH_PAGE_SIZE
+    Yields:
+        GameResult objects
+    """
+    count = page_size or STEAM_SEARCH_PAGE_SIZE
+    params = {"term": term, "cc": cc, "count": count, "infinite": 1}
+    if filter is not None:
+        params["filter"] = filter
+    if specials:
+        params["specials"] = 1
+
+    n, start = 0, 0
+    task = asyncio.ensure_future(_search_page(params, start, timeout))
+    try:
+        while task is not None:
+            results, total = await task
+            start += count
+            task = None
+            if results and start < total and not 0 < limit <= n + len(results):
+                task = asyncio.ensure_future(_search_page(params, start, timeout))
+            for result in results:
+                yield result
+                n += 1
+                if n >= limit > 0:
+                    return
+    finally:
+        if task is not None:
+            task.cancel()
+
+
+async def _search_page(params, start, timeout):
+    """Internal method which gets one page of search results, see iter_search
+
+    Returns:
+        a tuple (the results (list[GameResult]), the total number of results (int))
+    """
+    query = dict(params, start=start)
+    data = await _fetch("https://store.steampowered.com/search/results/?" + parse.urlencode(query), timeout=timeout, fmt="json")
+    if not isinstance(data, dict) or "results_html" not in data:
+        raise ValueError("failed to get search results from %s" % start)
+
+    results = await _parse(_parse_search_rows, data["results_html"])
+    return results, int(data.get("total_count") or 0)
+
+
+def _parse_search_rows(html):
+    """Internal method which parses the rows of the store's search infinite scroll endpoint, see iter_search"""
+    soup = _make_soup(html)
+    return [GameResult(row) for row in soup.find_all("a", {"class": "search_result_row"})]
 
 
 async def category_search(link, timeout=10, limit=-1, cc="gb"):
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/" + link + "&cc=" + cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
-
-        results = []
-        soups = soup.find_all("a", {"class": "search_result_row"})
-        for subsoup in soups:
-            results.append(CategoryResult(subsoup))
-            if 0 < limit <= len(results):
-                break
-        return results
+    text = await _fetch("https://store.steampowered.com/" + link + "&cc=" + cc, timeout=timeout, fmt="read")
+    return await _parse(_parse_category_page, text, limit)
+
+
+def _parse_category_page(text, limit):
+    """Internal method which parses the results on a category's search page, see category_search"""
+    text = _cut_rows(text, "a", "search_result_row", limit)
+    soup = _make_soup(text, _class_strainer("a", "search_result_row"))
+
+    results = []
+    soups = soup.find_all("a", {"class": "search_result_row"})
+    for subsoup in soups:
+        results.append(CategoryResult(subsoup))
+        if 0 < limit <= len(results):
+            break
+    return results
 
 async def top_search(*args, **kwargs):
     result = await category_search("search/?filter=topsellers", *args, **kwargs)
@@ -1140,19 +2797,23 @@ async def specials_search(*args, **kwargs):
     return result
 
 async def new_search(timeout=10, limit=-1, cc="gb"):
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/explore/new/?cc=%s" % cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
-
-        results = []
-        subsoups = soup.find_all("a", {"class": "tab_item"})
-        for subsoup in subsoups:
-            results.append(NewCategoryResult(subsoup))
-            if 0 < limit <= len(results):
-                break
+    text = await _fetch("https://store.steampowered.com/explore/new/?cc=%s" % cc, timeout=timeout, fmt="read")
+    return await _parse(_parse_new_page, text, limit)
 
-        return results
+
+def _parse_new_page(text, limit):
+    """Internal method which parses the new releases on the store's explore page, see new_search"""
+    text = _cut_rows(text, "a", "tab_item", limit)
+    soup = _make_soup(text, _class_strainer("a", "tab_item"))
+
+    results = []
+    subsoups = soup.find_all("a", {"class": "tab_item"})
+    for subsoup in subsoups:
+        results.append(NewCategoryResult(subsoup))
+        if 0 < limit <= len(results):
+            break
+
+    return results
 
 async def new_specials(timeout=10, limit=-1, cc="gb"):
     """Search for a game on steam
@@ -1164,27 +2825,113 @@ async def new_specials(timeout=10, limit=-1, cc="gb"):
     Returns:
         a list of GameResult objects containing the results
     """
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/search/?specials=1&cc=" + cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
-
-        subsoup = soup.findAll("div", {"id": "search_result_container"})[0]
-        rawResults = subsoup.findAll("a")
-        results = []
-        n = 0
-        for x in rawResults:
-            if n >= limit > 0:
-                break
-            n += 1
-            cls = x.get("class")
-            if cls is not None and "search_result_row" in cls:
-                gr = GameResult(x)
-                #await gr.update_price(currency, currency_symbol)
-                results.append(gr)
-        return results
+    text = await _fetch("https://store.steampowered.com/search/?specials=1&cc=" + cc, timeout=timeout, fmt="read")
+    return await _parse(_parse_search_page, text, limit)
+
+
+
+def _parse_front_page_tab(soup, tab_id, sale_capsules=False):
+    """Internal method to parse one of the tabs on the front page of the store
+
+    Args:
+        soup (BeautifulSoup): the soup of the front page
+        tab_id (str): the id of the tab's content div (e.g. tab_topsellers_content)
+        sale_capsules (bool, optional): whether to include the tab's sale capsules as SteamSaleResults
+    Returns:
+        a list of TopResult objects
+    """
+    subsoup = soup.find("div", {"id": tab_id})
+    if subsoup is None:
+        return []
+    results = []
+    for x in subsoup.findAll("a", recursive=False):
+        cls = x.get("class")
+        if cls is not None and "tab_item" in cls:
+            results.append(TopResult(x))
+        elif sale_capsules and cls is not None and "sale_capsule" in cls:
+            # sale capsules don't contain their game's title, see get_sale_titles
+            try:
+                results.append(SteamSaleResult(x))
+            except (AttributeError, TypeError, KeyError):
+                if STEAM_PRINTING:
+                    print("WARNING: failed to create result")
+    return results
+
+
+class FrontPage:
+    """Class containing every tab on the front page of the store, the sale capsules in top_sellers and specials
+    are SteamSaleResults which are titled "???" until they're passed to get_sale_titles"""
+    def __init__(self, soup):
+        """
+
+        Args:
+            soup (BeautifulSoup): the soup of the front page of the store
+        """
+        self.top_sellers = _parse_front_page_tab(soup, "tab_topsellers_content", sale_capsules=True)
+        self.new_releases = _parse_front_page_tab(soup, "tab_newreleases_content")
+        self.upcoming = _parse_front_page_tab(soup, "tab_upcoming_content")
+        self.specials = _parse_front_page_tab(soup, "tab_specials_content", sale_capsules=True)
+
+
+def _parse_front_page(text):
+    """Internal method which parses the front page of the store, see front_page"""
+    tabs = ["tab_topsellers_content", "tab_newreleases_content", "tab_upcoming_content", "tab_specials_content"]
+    return FrontPage(_make_soup(text, SoupStrainer("div", id=tabs)))
+
+
+async def front_page(timeout=10, cc="gb"):
+    """Gets every tab on the front page of the store, only downloading and parsing the page once
+
+    The result is cached for STEAM_FRONT_PAGE_TTL seconds, so calling top_sellers, new_releases, upcoming
+    and specials for the same country code only fetches the page once.
+
+    Args:
+        timeout (int, optional): how long aiohttp should wait before throwing a timeout error
+        cc (str, optional): the country code of the store to look at
+    Returns:
+        a FrontPage object
+    """
+    page = store_cache.get("front_page", cc)
+    if page is not None:
+        return page
+    return await _single_flight(("front_page", cc), _load_front_page, timeout, cc)
+
+
+async def _load_front_page(timeout, cc):
+    """Internal method which downloads, parses and caches the front page, see front_page"""
+    text = await _fetch("https://store.steampowered.com/?cc=" + cc, timeout=timeout, fmt="read")
+    page = await _parse(_parse_front_page, text)
+    if STEAM_FRONT_PAGE_TTL > 0:
+        store_cache.set("front_page", cc, page, ttl=STEAM_FRONT_PAGE_TTL)
+    return page
+
+
+async def _front_page_titled_results(results, limit, timeout):
+    """Internal method which finds the titles of the sale capsules in a front page tab, then copies its results.
+    Only the results being returned are looked up, and the titles are kept on the cached FrontPage
+
+    Args:
+        results (list[TopResult]): one of the lists on a FrontPage
+        limit (int): how many results to return, 0 or less returns every result
+        timeout (int): how long aiohttp should wait before throwing a timeout error
+    Returns:
+        a list of TopResult objects"""
+    await get_sale_titles(results[:limit] if limit > 0 else results, timeout=timeout)
+    return _front_page_results(results, limit)
 
 
+def _front_page_results(results, limit):
+    """Internal method which copies a front page tab's results, so callers can't modify the cached FrontPage
+
+    Args:
+        results (list[TopResult]): one of the lists on a FrontPage
+        limit (int): how many results to return, 0 or less returns every result
+    Returns:
+        a list of TopResult objects"""
+    if limit > 0:
+        results = results[:limit]
+    return [copy.copy(x) for x in results]
+
 
 async def top_sellers(timeout=60, limit=-1, cc="gb"):
     """gets the top sellers on the front page of the store
@@ -1194,34 +2941,8 @@ async def top_sellers(timeout=60, limit=-1, cc="gb"):
         limit (int, optional): how many results it should return, 0 or less returns every result found
     Returns:
         a list of TopResult objects"""
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/?cc=" + cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
-
-        subsoup = soup.find("div", {"id": "tab_topsellers_content"})
-        rawResults = subsoup.findAll("a", recursive=False)
-        results = []
-        n = 0
-        for x in rawResults:
-            if n >= limit > 0:
-                break
-
-            cls = x.get("class")
-            if cls is not None and "tab_item" in cls:
-            #if cls is not None and "sale_capsule" in cls:
-                tr = TopResult(x)
-                results.append(tr)
-                n += 1
-                #try:
-                #    tr = SteamSaleResult(x)
-                #    await tr.get_title(cc=cc, timeout=timeout)
-                #    #await tr.update_price(currency, currency_symbol)
-                #    results.append(tr)
-                #    n += 1
-                #except:
-                #    print("WARNING: failed to create result")
-        return results
+    page = await front_page(timeout=timeout, cc=cc)
+    return await _front_page_titled_results(page.top_sellers, limit, timeout)
 
 
 async def new_releases(timeout=10, limit=-1, cc="gb"):
@@ -1232,34 +2953,8 @@ async def new_releases(timeout=10, limit=-1, cc="gb"):
         limit (int, optional): how many results it should return, 0 or less returns every result found
     Returns:
         a list of TopResult objects"""
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/?cc=" + cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
-
-        subsoup = soup.find("div", {"id": "tab_newreleases_content"})
-        rawResults = subsoup.findAll("a", recursive=False)
-        results = []
-        n = 0
-        for x in rawResults:
-            if n >= limit > 0:
-                break
-            cls = x.get("class")
-
-            if cls is not None and "tab_item" in cls:
-            #if cls is not None and "sale_capsule" in cls:
-                tr = TopResult(x)
-                results.append(tr)
-                n += 1
-                #try:
-                #    tr = SteamSaleResult(x)
-                #    await tr.get_title(cc=cc, timeout=timeout)
-                #    #await tr.update_price(currency, currency_symbol)
-                #    results.append(tr)
-                #    n += 1
-                #except:
-                #    print("WARNING: failed to create result")
-        return results
+    page = await front_page(timeout=timeout, cc=cc)
+    return _front_page_results(page.new_releases, limit)
 
 
 async def upcoming(timeout=10, limit=-1, cc="gb"):
@@ -1270,33 +2965,8 @@ async def upcoming(timeout=10, limit=-1, cc="gb"):
         limit (int, optional): how many results it should return, 0 or less returns every result found
     Returns:
         a list of TopResult objects"""
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/?cc=" + cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
-
-        subsoup = soup.find("div", {"id": "tab_upcoming_content"})
-        rawResults = subsoup.findAll("a", recursive=False)
-        results = []
-        n = 0
-        for x in rawResults:
-            if n >= limit > 0:
-                break
-            cls = x.get("class")
-            if cls is not None and "tab_item" in cls:
-            #if cls is not None and "sale_capsule" in cls:
-                tr = TopResult(x)
-                results.append(tr)
-                n += 1
-                #try:
-                #    tr = SteamSaleResult(x)
-                #    await tr.get_title(cc=cc, timeout=timeout)
-                #    #await tr.update_price(currency, currency_symbol)
-                #    results.append(tr)
-                #    n += 1
-                #except:
-                #    print("WARNING: failed to create result")
-        return results
+    page = await front_page(timeout=timeout, cc=cc)
+    return _front_page_results(page.upcoming, limit)
 
 
 async def specials(timeout=10, limit=-1, cc="gb"):
@@ -1307,25 +2977,8 @@ async def specials(timeout=10, limit=-1, cc="gb"):
         limit (int, optional): how many results it should return, 0 or less returns every result found
     Returns:
         a list of TopResult objects"""
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/?cc=" + cc, timeout=timeout)
-        text = await resp.read()
-        soup = BeautifulSoup(text, "html.parser")
-
-        subsoup = soup.find("div", {"id": "tab_specials_content"})
-        rawResults = subsoup.findAll("a", recursive=False)
-        results = []
-        n = 0
-        for x in rawResults:
-            if n >= limit > 0:
-                break
-            cls = x.get("class")
-            if cls is not None and "tab_item" in cls:
-                tr = TopResult(x)
-                #await tr.update_price(currency, currency_symbol)
-                results.append(tr)
-                n += 1
-        return results
+    page = await front_page(timeout=timeout, cc=cc)
+    return await _front_page_titled_results(page.specials, limit, timeout)
 
 
 async def get_user(steamid, timeout=10, be_specific=False):
@@ -1333,7 +2986,8 @@ async def get_user(steamid, timeout=10, be_specific=False):
 
     Args:
         steamid (str): The user's steamid
-        timeout (int, optional): The amount of time before aiohttp raises a timeout error
+        timeout (int, optional): The amount of time before aiohttp raises a timeout error, calls batched together
+            (see STEAM_USER_BATCH_WINDOW) share one request using the longest of their timeouts
     Returns:
         a UserResult object
         """
@@ -1341,16 +2995,92 @@ async def get_user(steamid, timeout=10, be_specific=False):
         steamid = await search_for_userid(steamid, be_specific=be_specific)
     if steamid is not None:
         _check_key_set()
-        async with aiohttp.ClientSession() as session:
-            resp = await session.get("https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v0002/?key=" + STEAM_KEY + "&steamids=" + steamid, timeout=timeout)
-            data = await resp.json()
-
-            if "response" in data and "players" in data["response"] and len(data["response"]["players"]) > 0:
-                player = data["response"]["players"][0]
-                return UserResult(player)
+        steamid = str(steamid)  # get_users returns str steamids, whatever they were requested with
+        if STEAM_USER_BATCH_WINDOW > 0:
+            return await _get_user_batched(steamid, timeout)
+        users = await get_users([steamid], timeout=timeout)
+        return users.get(steamid)
     return None
 
 
+async def get_users(steamids, timeout=10):
+    """Gets some information about a list of steamids, using one request for every 100 steamids
+
+    Args:
+        steamids (list[str]): The users' steamids, duplicates are only requested once
+        timeout (int, optional): The amount of time before aiohttp raises a timeout error
+    Returns:
+        a dict mapping steamids (str) to UserResult objects, steamids which weren't found are left out
+        """
+    _check_key_set()
+    steamids = list(dict.fromkeys(str(steamid) for steamid in steamids))
+    chunks = [steamids[i:i+100] for i in range(0, len(steamids), 100)]
+    responses = await asyncio.gather(*[_fetch("https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v0002/?key=" + STEAM_KEY + "&steamids=" + ",".join(chunk), timeout=timeout, fmt="json") for chunk in chunks])
+
+    users = {}
+    for data in responses:
+        if "response" in data and "players" in data["response"]:
+            for player in data["response"]["players"]:
+                user = UserResult(player)
+                users[user.id] = user
+    return users
+
+
+class _UserBatch:
+    """Internal class holding the steamids which get_user calls are waiting on, see _get_user_batched"""
+    def __init__(self, loop, timeout):
+        self.loop = loop
+        self.timeout = timeout  # the longest timeout of the get_user calls in the batch
+        self.futures = {}  # maps steamids to the future their callers are waiting on
+        self.flushed = False
+
+
+async def _get_user_batched(steamid, timeout):
+    """Internal method which adds a steamid to the batch of users being gathered, the batch is requested
+    STEAM_USER_BATCH_WINDOW seconds after it was started, or as soon as it holds 100 steamids"""
+    global _user_batch
+    loop = asyncio.get_running_loop()
+    if _user_batch is None or _user_batch.loop is not loop:
+        _user_batch = _UserBatch(loop, timeout)
+        loop.call_later(STEAM_USER_BATCH_WINDOW, _flush_user_batch, _user_batch)
+    batch = _user_batch
+    batch.timeout = max(batch.timeout, timeout)
+
+    future = batch.futures.get(steamid)
+    if future is None:
+        future = batch.futures[steamid] = loop.create_future()
+        if len(batch.futures) >= 100:
+            _flush_user_batch(batch)
+    return await asyncio.shield(future)
+
+
+def _flush_user_batch(batch):
+    """Internal method which requests every steamid in a batch, see _get_user_batched"""
+    global _user_batch
+    if _user_batch is batch:
+        _user_batch = None
+    if batch.flushed:
+        return
+    batch.flushed = True
+
+    async def request():
+        try:
+            users = await get_users(list(batch.futures), timeout=batch.timeout)
+        except Exception as e:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()  # marks the exception as retrieved in case every caller was cancelled
+            return
+        for steamid, future in batch.futures.items():
+            if not future.done():
+                future.set_result(users.get(steamid))
+
+    task = asyncio.ensure_future(request())
+    _user_batch_tasks.add(task)
+    task.add_done_callback(_user_batch_tasks.discard)
+
+
 async def get_user_library(steamid, timeout=10, be_specific=False):
     """Gets a list of all the games a user owns
 
@@ -1364,19 +3094,14 @@ async def get_user_library(steamid, timeout=10, be_specific=False):
         steamid = await search_for_userid(steamid, be_specific=be_specific)
     if steamid is not None:
         _check_key_set()
-        async with aiohttp.ClientSession() as session:
-            resp = await session.get("https://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/?key=" + STEAM_KEY + "&steamid=" + steamid + "&format=json&include_appinfo=1&include_played_free_games=1", timeout=timeout)
-            data = await resp.json()
+        data = await _fetch("https://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/?key=" + STEAM_KEY + "&steamid=" + steamid + "&format=json&include_appinfo=1&include_played_free_games=1", timeout=timeout, fmt="json")
 
-            if "response" in data:
-                player = data["response"]
-                return UserLibrary(player)
+        if "response" in data:
+            player = data["response"]
+            return UserLibrary(player)
     return None
 
 
-userid_cache = {}  # caches search terms to steamids
-
-
 async def get_user_id(name, timeout=10):
     """Resolves a username to a steamid, however is limited to ONLY vanity URL's. search_user_id is recommended
 
@@ -1386,20 +3111,23 @@ async def get_user_id(name, timeout=10):
     Returns:
         either None or a steamid (str) if a vanity url matching that name is found
         """
-    if name in userid_cache:
-        return userid_cache[name]
+    steamid = await cache.aget("userid", name)
+    if steamid is not None:
+        return steamid
+    elif negative_cache.get("vanity", name):
+        return None
     else:
         _check_key_set()
-        async with aiohttp.ClientSession() as session:
-            resp = await session.get("https://api.steampowered.com/ISteamUser/ResolveVanityURL/v0001/?key=" + STEAM_KEY + "&vanityurl=" + parse.quote(name), timeout=timeout)
-            data = await resp.json()
-
-            if "response" in data and "success" in data["response"] and data["response"]["success"] == 1:
-                id = data["response"]["steamid"]
-                if STEAM_CACHE:
-                    userid_cache[name] = id
-                return id
-            return None
+        data = await _fetch("https://api.steampowered.com/ISteamUser/ResolveVanityURL/v0001/?key=" + STEAM_KEY + "&vanityurl=" + parse.quote(name), timeout=timeout, fmt="json")
+
+        if "response" in data and "success" in data["response"] and data["response"]["success"] == 1:
+            id = data["response"]["steamid"]
+            if STEAM_CACHE:
+                cache.set("userid", name, id)
+            return id
+        if STEAM_CACHE:
+            negative_cache.set("vanity", name, True)
+        return None
 
 
 async def search_for_userid(username, timeout=10, be_specific=False):
@@ -1411,20 +3139,24 @@ async def search_for_userid(username, timeout=10, be_specific=False):
     Returns:
         A steamid (str)
         """
-    if username in userid_cache:
-        return userid_cache[username]
+    steamid = await cache.aget("userid", username)
+    if steamid is not None:
+        return steamid
     else:
         if be_specific:
             uid = await get_user_id(username, timeout=timeout)
             return uid
+        elif negative_cache.get("userid", username):
+            return None
         else:
             links = await search_for_users(username, limit=1, timeout=timeout)
             if len(links) > 0:
                 uid = await extract_id_from_url(links[0][0], timeout=timeout)
-                return uid
             else:
                 uid = await get_user_id(username, timeout=timeout)
-                return uid
+            if uid is None and STEAM_CACHE:
+                negative_cache.set("userid", username, True)
+            return uid
 
 
 async def search_for_users(username, limit=1, timeout=10):
@@ -1438,20 +3170,23 @@ async def search_for_users(username, limit=1, timeout=10):
         a list of tuples containing (steam_profile_url (str), steam_user_name (str))
         """
     _check_session_set()
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://steamcommunity.com/search/SearchCommunityAjax?text=" + parse.quote(username) + "&filter=users&sessionid=" + STEAM_SESSION + "&page=1", headers={"Cookie": "sessionid=" + STEAM_SESSION}, timeout=timeout)
-        data = await resp.json()
-        soup = BeautifulSoup(data["html"], "html.parser")
-        stuff = soup.find_all("a", {"class": "searchPersonaName"})
-        links = []
-        for thing in stuff:
-            try:
-                links.append((thing.get("href"), thing.get_text()))
-                if len(links) >= limit > 0:
-                    return links
-            except:
-                pass
-        return links
+    data = await _fetch("https://steamcommunity.com/search/SearchCommunityAjax?text=" + parse.quote(username) + "&filter=users&sessionid=" + STEAM_SESSION + "&page=1", headers={"Cookie": "sessionid=" + STEAM_SESSION}, timeout=timeout, fmt="json")
+    return await _parse(_parse_user_links, data["html"], limit)
+
+
+def _parse_user_links(html, limit):
+    """Internal method which parses the users out of a community search, see search_for_users"""
+    soup = _make_soup(html)
+    stuff = soup.find_all("a", {"class": "searchPersonaName"})
+    links = []
+    for thing in stuff:
+        try:
+            links.append((thing.get("href"), thing.get_text()))
+            if len(links) >= limit > 0:
+                return links
+        except:
+            pass
+    return links
 
 
 async def extract_id_from_url(url, timeout=10):
@@ -1471,7 +3206,7 @@ async def extract_id_from_url(url, timeout=10):
         return id
 
 
-async def get_item(appid, item_name, timeout=10, currency="GBP", currency_symbol="£"):
+async def get_item(appid, item_name, timeout=10, currency="GBP", currency_symbol="£", full=False):
     """Gets information about an item from the market
 
     Args:
@@ -1480,30 +3215,598 @@ async def get_item(appid, item_name, timeout=10, currency="GBP", currency_symbol
         timeout (int, optional): The amount of time before aiohttp raises a timeout error
         currency (str, optional): The currency to convert the item's price to (default GBP)
         currency_symbol (str, optional): the currency symbol to use for the item's price (default £)
+        full (bool, optional): whether to scrape the item's listings page for its actions and description,
+            otherwise only the much smaller priceoverview is requested and they're left empty
     Returns:
         an ItemResult object
         """
+    result = await _load_item(appid, item_name, currency, timeout, full)
+    if result is not None:
+        await result.update_price(currency, currency_symbol)
+        return result
+
+
+async def get_items(pairs, timeout=10, currency="GBP", currency_symbol="£", full=False, concurrency=None):
+    """Gets many items from the market at once, yielding each one as soon as it's found.
+    Duplicate pairs are only fetched once, names are resolved from the cache where possible, requests are paced
+    by the rate limit of steamcommunity.com (see set_rate_limit) and the exchange rates are only fetched once
+    (see get_rates), only for items whose price isn't already in currency
+
+    Args:
+        pairs (list): a list of tuples (appid, item_name), see get_item
+        timeout (int, optional): The amount of time before aiohttp raises a timeout error
+        currency (str, optional): The currency to convert the items' prices to (default GBP)
+        currency_symbol (str, optional): the currency symbol to use for the items' prices (default £)
+        full (bool, optional): whether to scrape each item's listings page for its actions and description
+        concurrency (int, optional): the most items to fetch at once, defaults to STEAM_ITEMS_CONCURRENCY
+    Yields:
+        tuples (appid (str), item_name (str), ItemResult or None if the item couldn't be found) in the order
+        they're found, appid and item_name are the pair they were requested with
+
+    Raises:
+        SteamRateLimited: if the market kept rate limiting us, the items which haven't been yielded yet are cancelled
+    """
+    semaphore = asyncio.Semaphore(concurrency or STEAM_ITEMS_CONCURRENCY)
+
+    async def fetch(pair):
+        async with semaphore:
+            try:
+                return pair, await _load_item(pair[0], pair[1], currency, timeout, full)
+            except SteamRateLimited:
+                raise
+            except Exception:
+                if STEAM_PRINTING:
+                    print("failed to get item %s" % (pair,))
+                return pair, None
+
+    tasks = [asyncio.ensure_future(fetch(pair)) for pair in dict.fromkeys(tuple(pair) for pair in pairs)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            pair, result = await task
+            if result is not None:
+                await result.update_price(currency, currency_symbol)
+            yield pair[0], pair[1], result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _load_item(appid, item_name, currency, timeout, full):
+    """Internal method which finds an item and gets its price without converting it, see get_item
+
+    Returns:
+        an ItemResult object, or None if the item couldn't be found
+    """
     if not is_integer(appid):
         appdata = await get_app(appid, timeout)
         appid = appdata[0]
     if appid is not None:
         item_name = await get_item_name(item_name, appid, timeout=timeout)
         if item_name is not None:
-            async with aiohttp.ClientSession() as session:
-                resp = await session.get("https://steamcommunity.com/market/listings/" + appid + "/" + parse.quote(item_name), timeout=timeout)
-                text = await resp.text()
-                soup = BeautifulSoup(text, "html.parser")
+            result = None
+            if not full:
+                result = await _get_item_overview(appid, item_name, currency, timeout)
+            if result is None:
+                text = await _fetch("https://steamcommunity.com/market/listings/" + appid + "/" + parse.quote(item_name), timeout=timeout, fmt="read")
+                result = await _parse(_parse_item, text)
+            return result
 
-                result = ItemResult(soup)
-                await result.update_price(currency, currency_symbol)
-                return result
 
+async def get_price_history(appid, item_name, timeout=10):
+    """Gets an item's price history from its listings page on the market
+
+    Args:
+        appid (str): The appid of the game the item belongs to, or the name if you don't know the ID
+        item_name (str): The item you're searching for
+        timeout (int, optional): The amount of time before aiohttp raises a timeout error
+    Returns:
+        a PriceHistory object, or None if the item couldn't be found
+    """
+    result = await _load_item(appid, item_name, None, timeout, True)
+    if result is not None:
+        return result.history
+
+
+async def _get_item_overview(appid, item_name, currency, timeout):
+    """Internal method which builds an ItemResult from the market's priceoverview endpoint and the item's cached
+    asset description (see get_item_name), the price is requested in currency if the market supports it
+
+    Returns:
+        an ItemResult object, or None if the price couldn't be found, its currency is only guessed from the
+        price's symbol if the market can't give the price in currency
+    """
+    url = "https://steamcommunity.com/market/priceoverview/?appid=" + appid + "&market_hash_name=" + parse.quote(item_name)
+    if currency in MARKET_CURRENCIES:
+        url += "&currency=%s" % MARKET_CURRENCIES[currency]
+    try:
+        data = await _fetch(url, timeout=timeout, fmt="json")
+    except SteamRateLimited:
+        raise  # falling back to the listings page would only send more requests to the same host
+    except Exception:
+        return None
+    if not isinstance(data, dict) or not data.get("success"):
+        return None
+
+    rawprice = data.get("lowest_price") or data.get("median_price")
+    if rawprice is None:
+        return None
+    asset = dict(market_cache.get("market_asset", appid + "::" + item_name) or {})
+    asset.setdefault("name", item_name)
+    result = ItemResult(rawprice, asset=asset)
+    if currency in MARKET_CURRENCIES:
+        # the price is already in the currency we asked for, and symbols like ¥ or kr are shared by several currencies
+        result.currency = currency
+    return result
+
+
+def _parse_item(text):
+    """Internal method which parses an item's market listings page, see get_item"""
+    return ItemResult(*_extract_market_page(text))
+
+
+_PRICE_RE = re.compile(r"^([^0-9.,]*)(.*?)([^0-9.,]*)$", re.DOTALL)  # splits a price in to (before, number, after)
+_MARKET_PRICE_RE = re.compile(rb'<span[^>]*class="[^"]*\bmarket_listing_price_with_publisher_fee_only\b[^"]*"[^>]*>(.*?)</span>', re.DOTALL)
+_MARKET_ICON_RE = re.compile(rb'"icon_url":\s*"([^"]*)"')
+_MARKET_ASSETS_RE = re.compile(rb"var g_rgAssets\s*=\s*")
+_MARKET_HISTORY_RE = re.compile(rb"var line1\s*=\s*\[")
+_MARKET_HISTORY_ITEM_RE = re.compile(rb"\[([^\[\]]*)\]|\]")  # a point of line1, or the ] closing it
+_MARKET_HISTORY_POINT_RE = re.compile(rb'\s*"(\w{3}) (\d+) (\d{4}) (\d+)[^"]*",\s*([-\d.eE]+),\s*"?([\d,]+)"?\s*')
+_MONTHS = {name.encode(): number for number, name in enumerate(calendar.month_abbr) if name}
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def _strip_tags(markup):
+    """Internal method which gets the text out of a small piece of HTML, without parsing it"""
+    return html.unescape(_TAG_RE.sub("", markup))
+
+
+def _extract_market_page(page):
+    """Internal method which finds the parts of an item's market listings page ItemResult needs,
+    straight from the page's bytes instead of parsing the whole page
+
+    Args:
+        page (bytes | str): the listings page
+    Returns:
+        a tuple (rawprice (str), icon_url (str), asset (dict), history (PriceHistory)), each is None if it isn't
+        on the page
+    """
+    if isinstance(page, str):
+        page = page.encode("utf-8")
+
+    rawprice = None
+    match = _MARKET_PRICE_RE.search(page)
+    if match is not None:
+        rawprice = _strip_tags(match.group(1).decode("utf-8", "replace"))
+
+    icon_url = None
+    match = _MARKET_ICON_RE.search(page)
+    if match is not None:
+        icon_url = match.group(1).decode("utf-8", "replace").replace(" ", "")
+
+    asset = None
+    match = _MARKET_ASSETS_RE.search(page)
+    if match is not None:
+        end = page.find(b"\n", match.end())
+        line = page[match.end():end if end >= 0 else len(page)].decode("utf-8", "replace")
+        try:
+            assets, _ = json.JSONDecoder().raw_decode(line)
+            # g_rgAssets maps appid -> contextid -> assetid -> description, the item is the first tradable one
+            for contexts in (assets.values() if isinstance(assets, dict) else assets):
+                for items in (contexts.values() if isinstance(contexts, dict) else contexts):
+                    for item in (items.values() if isinstance(items, dict) else items):
+                        if asset is None and item.get("tradable") == 1:
+                            asset = item
+        except (ValueError, AttributeError):
+            pass
+
+    history = None
+    match = _MARKET_HISTORY_RE.search(page)
+    if match is not None:
+        history = _extract_price_history(page, match.end())
+    return rawprice, icon_url, asset, history
+
+
+def _extract_price_history(page, start):
+    """Internal method which reads the points of a listings page's price history (var line1) straight in to arrays,
+    each point looks like ["Mar 20 2014 01: +0",0.95,"123"]
+
+    Args:
+        page (bytes): the listings page
+        start (int): the index just after the opening [ of line1
+    Returns:
+        a PriceHistory object
+    """
+    history = PriceHistory()
+    days = {}  # maps (year, month, day) to the timestamp of the start of that day
+    for item in _MARKET_HISTORY_ITEM_RE.finditer(page, start):
+        if item.group(1) is None:
+            break  # the ] closing line1
+        match = _MARKET_HISTORY_POINT_RE.fullmatch(item.group(1))
+        if match is None or match.group(1) not in _MONTHS:
+            continue  # skip points we can't read (e.g. a null price) rather than the rest of the history
+        month, day, year, hour, price, volume = match.groups()
+        date = (year, month, day)
+        if date not in days:
+            days[date] = calendar.timegm((int(year), _MONTHS[month], int(day), 0, 0, 0))
+        history._append(days[date] + int(hour) * 3600, float(price), int(volume.replace(b",", b"")))
+    return history
+
+
+def _normalize_app_name(name):
+    """Internal method to normalize an app name for the app index, lowercases it and removes symbols
+
+    Args:
+        name (str): the app name
+    Returns:
+        the normalized name (str)
+    """
+    return " ".join(re.sub(r"[^\w]+", " ", name.lower()).split())
+
+
+def _trigrams(name):
+    """Internal method to get the set of trigrams in a normalized name, padded so short names still have some"""
+    name = "  " + name + " "
+    return {name[i:i+3] for i in range(len(name) - 2)}
+
+
+def _read_app_list(path):
+    """Internal method to read a JSON app list, either the response of ISteamApps/GetAppList or a list of
+    {"appid": ..., "name": ...} objects
+
+    Returns:
+        a list of (appid, name) tuples
+    """
+    with open(path, encoding="utf-8") as f:
+        return _read_app_list_text(f.read())
+
+
+def _read_app_list_text(text):
+    """Internal method to parse a JSON app list, see _read_app_list"""
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("applist", data).get("apps", [])
+    return [(app.get("appid"), app.get("name") or "") for app in data]
+
+
+class AppIndex:
+    """Class containing a local index of app names, used to resolve names to appids without searching the store"""
+    def __init__(self, apps):
+        """
+
+        Args:
+            apps (iterable): (appid, name) pairs, if several apps have the same name the first one is used
+        """
+        self.names = {}  # maps normalized names to (appid (str), apptitle (str)) tuples
+        self.titles = {}  # maps appids (str) to apptitles (str)
+        for appid, title in apps:
+            appid = str(appid)
+            normalized = _normalize_app_name(title)
+            if normalized == "":
+                continue
+            self.titles.setdefault(appid, title)
+            self.names.setdefault(normalized, (appid, title))
+
+        self._sorted = sorted(self.names)  # the normalized names in order, for prefix searches
+        self._trigrams = collections.defaultdict(list)  # maps trigrams to indexes in to _sorted
+        for i, normalized in enumerate(self._sorted):
+            for trigram in _trigrams(normalized):
+                self._trigrams[trigram].append(i)
+
+    @classmethod
+    def from_file(cls, path):
+        """Loads an index from a JSON app list, either the response of ISteamApps/GetAppList or a list of
+        {"appid": ..., "name": ...} objects
+
+        Args:
+            path (str): the path of the JSON file
+        Returns:
+            an AppIndex object
+        """
+        return cls(_read_app_list(path))
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_title(self, appid):
+        """Gets the title of an app
+
+        Args:
+            appid (str): the appid of the app
+        Returns:
+            the app's title (str) or None if it isn't in the index
+        """
+        return self.titles.get(str(appid))
+
+    def search(self, name, min_score=0.6, prefix_limit=50):
+        """Finds the app best matching a name, trying an exact match, then the shortest name starting with it,
+        then the name sharing the most trigrams with it
+
+        Args:
+            name (str): the name of the app
+            min_score (float, optional): how similar (0 to 1) a fuzzy match has to be, 1 or more disables fuzzy matching
+            prefix_limit (int, optional): how many names starting with name to consider
+        Returns:
+            A tuple containing (appid (str), apptitle (str)), or None if no app matched
+        """
+        normalized = _normalize_app_name(name)
+        if normalized == "":
+            return None
+        if normalized in self.names:
+            return self.names[normalized]
+
+        best = None
+        i = bisect.bisect_left(self._sorted, normalized)
+        for candidate in self._sorted[i:i+prefix_limit]:
+            if not candidate.startswith(normalized):
+                break
+            if best is None or len(candidate) < len(best):
+                best = candidate
+        if best is not None:
+            return self.names[best]
+
+        if min_score >= 1:
+            return None
+        return self.fuzzy_search(name, min_score)
+
+    def fuzzy_search(self, name, min_score=0.6, max_postings=2000, candidate_limit=100):
+        """Finds the app whose name shares the most trigrams with a name, this takes milliseconds on a large index
+        so get_app runs it in the parse executor
+
+        Only the rarest trigrams are used to find candidates, trigrams shared by more than max_postings names
+        (like " th") are skipped unless every trigram is that common, then the candidate_limit candidates sharing
+        the most of them are scored with all their trigrams
+
+        Args:
+            name (str): the name of the app
+            min_score (float, optional): how similar (0 to 1) the match has to be
+            max_postings (int, optional): how many names a trigram can be in before it's too common to find candidates
+            candidate_limit (int, optional): how many candidates to score
+        Returns:
+            A tuple containing (appid (str), apptitle (str)), or None if no app matched
+        """
+        normalized = _normalize_app_name(name)
+        if normalized == "":
+            return None
+        trigrams = _trigrams(normalized)
+        counts = collections.Counter()
+        for postings in sorted((self._trigrams[t] for t in trigrams if t in self._trigrams), key=len):
+            if counts and len(postings) > max_postings:
+                break
+            counts.update(postings)
+
+        best, best_score = None, 0
+        for i, _ in counts.most_common(candidate_limit):
+            candidate = self._sorted[i]
+            # Dice coefficient, using the padded length of the candidate as the size of its trigram set
+            score = 2 * len(trigrams & _trigrams(candidate)) / (len(trigrams) + len(candidate) + 1)
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is not None and best_score >= min_score:
+            return self.names[best]
+        return None
+
+
+class CompactAppIndex:
+    """Class containing a local index of app names stored in a compact file which is memory mapped, so it loads
+    instantly and every process using the same file shares one read-only copy. Unlike AppIndex it only matches
+    names exactly or by prefix, there's no fuzzy matching.
+
+    The file contains a header (magic, version, number of names, number of apps), then the offsets of each
+    normalized name, the appid of each name, the sorted appids, the offsets of each app's title and finally the
+    names and titles themselves as UTF-8. Names are sorted by their UTF-8 bytes, and every integer is a little
+    endian unsigned 32-bit int."""
+    MAGIC = b"SSAI"
+    VERSION = 1
+    HEADER = struct.Struct("<4sIII")
+
+    def __init__(self, path):
+        """
+
+        Args:
+            path (str): the path of a file written by CompactAppIndex.write
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._name_count, self._app_count = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError("%s isn't a compact app index" % path)
+
+        self._name_offsets = self.HEADER.size
+        self._name_appids = self._name_offsets + 4 * (self._name_count + 1)
+        self._appids = self._name_appids + 4 * self._name_count
+        self._title_offsets = self._appids + 4 * self._app_count
+        self._names = self._title_offsets + 4 * (self._app_count + 1)
+        self._titles = self._names + self._int(self._name_offsets, self._name_count)
+
+    @classmethod
+    def write(cls, apps, path):
+        """Writes a compact index file
+
+        Args:
+            apps (iterable): (appid, name) pairs, if several apps have the same name the first one is used
+            path (str): where to write the index, it's replaced once it has been written
+        """
+        names = {}
+        titles = {}
+        for appid, title in apps:
+            if not is_integer(appid):
+                continue
+            normalized = _normalize_app_name(title).encode("utf-8")
+            if normalized == b"":
+                continue
+            titles.setdefault(int(appid), title.encode("utf-8"))
+            names.setdefault(normalized, int(appid))
+
+        sorted_names = sorted(names)
+        sorted_appids = sorted(titles)
+        parts = [cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(sorted_names), len(sorted_appids))]
+        parts.append(struct.pack("<%dI" % (len(sorted_names) + 1), *itertools.accumulate([0] + [len(n) for n in sorted_names])))
+        parts.append(struct.pack("<%dI" % len(sorted_names), *[names[n] for n in sorted_names]))
+        parts.append(struct.pack("<%dI" % len(sorted_appids), *sorted_appids))
+        parts.append(struct.pack("<%dI" % (len(sorted_appids) + 1), *itertools.accumulate([0] + [len(titles[a]) for a in sorted_appids])))
+        parts.append(b"".join(sorted_names))
+        parts.append(b"".join(titles[a] for a in sorted_appids))
+        _write_file(path, b"".join(parts))
+
+    def _int(self, start, i):
+        return struct.unpack_from("<I", self._map, start + 4 * i)[0]
+
+    def _name(self, i):
+        return self._map[self._names + self._int(self._name_offsets, i):self._names + self._int(self._name_offsets, i + 1)]
+
+    def __len__(self):
+        return self._name_count
+
+    def get_title(self, appid):
+        """Gets the title of an app
+
+        Args:
+            appid (str): the appid of the app
+        Returns:
+            the app's title (str) or None if it isn't in the index
+        """
+        if not is_integer(appid):
+            return None
+        appid = int(appid)
+        lo, hi = 0, self._app_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._int(self._appids, mid) < appid:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._app_count or self._int(self._appids, lo) != appid:
+            return None
+        start = self._titles + self._int(self._title_offsets, lo)
+        end = self._titles + self._int(self._title_offsets, lo + 1)
+        return self._map[start:end].decode("utf-8")
+
+    def _result(self, i):
+        appid = str(self._int(self._name_appids, i))
+        return appid, self.get_title(appid)
+
+    def search(self, name, min_score=0.6, prefix_limit=50):
+        """Finds the app best matching a name, trying an exact match then the shortest name starting with it
+
+        Args:
+            name (str): the name of the app
+            min_score (float, optional): unused, CompactAppIndex doesn't do fuzzy matching
+            prefix_limit (int, optional): how many names starting with name to consider
+        Returns:
+            A tuple containing (appid (str), apptitle (str)), or None if no app matched
+        """
+        normalized = _normalize_app_name(name).encode("utf-8")
+        if normalized == b"":
+            return None
+        lo, hi = 0, self._name_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name(mid) < normalized:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        best, best_length = None, None
+        for i in range(lo, min(lo + prefix_limit, self._name_count)):
+            candidate = self._name(i)
+            if candidate == normalized:
+                return self._result(i)
+            if not candidate.startswith(normalized):
+                break
+            if best is None or len(candidate) < best_length:
+                best, best_length = i, len(candidate)
+        return self._result(best) if best is not None else None
+
+    def close(self):
+        """Unmaps the index file, load_app_index and refresh_app_index do this when they replace the index"""
+        self._map.close()
+
+
+app_index = None  # the local AppIndex or CompactAppIndex get_app checks before searching the store (see load_app_index)
+
+
+def load_app_index(path):
+    """Loads (or reloads) the local app index get_app and get_game_name_by_id use to resolve names without
+    searching the store, the store is still searched for names which aren't in the index
+
+    Args:
+        path (str): the path of a JSON app list, e.g. a saved response of ISteamApps/GetAppList/v2
+            (see refresh_app_index), or of a compact index (see compact_app_index), or None to stop using a local index
+    Returns:
+        the loaded AppIndex or CompactAppIndex, or None
+    """
+    if path is None:
+        return _set_app_index(None)
+    with open(path, "rb") as f:
+        compact = f.read(len(CompactAppIndex.MAGIC)) == CompactAppIndex.MAGIC
+    return _set_app_index(CompactAppIndex(path) if compact else AppIndex.from_file(path))
+
+
+def _set_app_index(index):
+    """Internal method which replaces the local app index, unmapping the previous one if it was a CompactAppIndex
+
+    Returns:
+        the new index
+    """
+    global app_index
+    previous, app_index = app_index, index
+    if isinstance(previous, CompactAppIndex) and previous is not index:
+        previous.close()
+    return index
 
-gameid_cache = {}  # caches search terms to (appid, appname) tuples
+
+def compact_app_index(app_list_path, path):
+    """Converts a JSON app list in to a compact index, which can be memory mapped by load_app_index
+
+    Args:
+        app_list_path (str): the path of the JSON app list
+        path (str): where to write the compact index
+    """
+    CompactAppIndex.write(_read_app_list(app_list_path), path)
+
+
+async def refresh_app_index(path, compact=False, timeout=60):
+    """Downloads the full list of apps from the Steam API, saves it to path and loads it as the local app index
+
+    Args:
+        path (str): where to save the app list, it's replaced once the download has finished
+        compact (bool, optional): True to save it as a compact index instead of JSON (see compact_app_index)
+        timeout (int, optional): the amount of time before aiohttp raises a timeout error
+    Returns:
+        the loaded AppIndex or CompactAppIndex
+    """
+    text = await _fetch("https://api.steampowered.com/ISteamApps/GetAppList/v2/", timeout=timeout)
+    loop = asyncio.get_running_loop()
+    if compact:
+        apps = await loop.run_in_executor(None, _read_app_list_text, text)
+        await loop.run_in_executor(None, CompactAppIndex.write, apps, path)
+        index = CompactAppIndex(path)
+    else:
+        await loop.run_in_executor(None, _write_file, path, text)
+        index = await loop.run_in_executor(None, AppIndex.from_file, path)
+    return _set_app_index(index)
+
+
+def _write_file(path, data):
+    """Internal method which replaces a file's contents (str or bytes), without anyone being able to read it half written"""
+    # every writer gets its own temporary file, so two writers at once can't replace path with a mixture of both
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + ".")
+    try:
+        os.chmod(temp_path, 0o644)  # mkstemp only lets its owner read the file, and the index is shared
+        with os.fdopen(fd, "wb") as f:
+            f.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
 
 
 async def get_app(name, timeout=10):
-    """Gets an appid based off of the app name
+    """Gets an appid based off of the app name, using the local app index if one is loaded (see load_app_index)
 
     Args:
         name (str): the name of the app (game)
@@ -1511,19 +3814,36 @@ async def get_app(name, timeout=10):
     Returns:
         A tuple containing (appid (str), apptitle (str))
         """
-    if name in gameid_cache:
-        return gameid_cache[name]
-    else:
-        dat = await get_games(name, limit=1, timeout=timeout)
-        if len(dat) > 0:
-            if STEAM_CACHE:
-                gameid_cache[name] = (dat[0].id, dat[0].title)
-            return dat[0].id, dat[0].title
+    app = await cache.aget("gameid", name)
+    if app is not None:
+        return app
+    index = app_index
+    app = index.search(name, min_score=1) if index is not None else None
+    if app is None and isinstance(index, AppIndex) and STEAM_APP_INDEX_MIN_SCORE < 1:
+        if STEAM_PARSE_EXECUTOR == "process":
+            # the whole index would be copied to the worker process for every search
+            app = await asyncio.get_running_loop().run_in_executor(None, index.fuzzy_search, name, STEAM_APP_INDEX_MIN_SCORE)
         else:
-            return None, None
+            app = await _parse(index.fuzzy_search, name, STEAM_APP_INDEX_MIN_SCORE)
+    if app is not None:
+        return app
+    elif negative_cache.get("gameid", name):
+        return None, None
+    else:
+        return await _single_flight(("get_app", name), _search_app, name, timeout)
 
 
-item_name_cache = {}  # caches search terms to item url names
+async def _search_app(name, timeout):
+    """Internal method which searches the store for an app and caches it, see get_app"""
+    dat = await get_games(name, limit=1, timeout=timeout)
+    if len(dat) > 0:
+        if STEAM_CACHE:
+            cache.set("gameid", name, (dat[0].id, dat[0].title))
+        return dat[0].id, dat[0].title
+    else:
+        if STEAM_CACHE:
+            negative_cache.set("gameid", name, True)
+        return None, None
 
 
 async def get_item_name(name, appid, timeout=10):
@@ -1537,78 +3857,128 @@ async def get_item_name(name, appid, timeout=10):
         the item name (str) or None if no item could be found
         """
     cache_name = appid + "::" + name
-    if cache_name in item_name_cache:
-        return item_name_cache[cache_name]
+    item_name = await cache.aget("item_name", cache_name)
+    if item_name is None:
+        # another search may have found it, keep it with the names that have been looked up so it isn't evicted by searches
+        item_name = market_cache.get("item_name", cache_name)
+        if item_name is not None and STEAM_CACHE:
+            cache.set("item_name", cache_name, item_name)
+    if item_name is not None:
+        return item_name
+    elif negative_cache.get("item_name", cache_name):
+        return None
     else:
-        async with aiohttp.ClientSession() as session:
+        try:
+            item_name = await _search_item_names(name, appid, timeout)
+        except SteamRateLimited:
+            raise
+        except Exception:
+            # fall back to scraping the market's search page
             if appid != "":
-                resp = await session.get("https://steamcommunity.com/market/search?appid=" + appid + "&q=" + parse.quote(name), timeout=timeout)
+                text = await _fetch("https://steamcommunity.com/market/search?appid=" + appid + "&q=" + parse.quote(name), timeout=timeout)
             else:
-                resp = await session.get("https://steamcommunity.com/market/search?q=" + parse.quote(name), timeout=timeout)
-            text = await resp.text()
-            soup = BeautifulSoup(text, "html.parser")
-
-            namesoup = soup.find("span", {"class": "market_listing_item_name"})
-            if namesoup is not None:
-                item_name = namesoup.get_text()
-                if STEAM_CACHE:
-                    item_name_cache[cache_name] = item_name
-                return item_name
-            return None
+                text = await _fetch("https://steamcommunity.com/market/search?q=" + parse.quote(name), timeout=timeout)
+            item_name = await _parse(_parse_item_name, text)
+        if item_name is not None:
+            if STEAM_CACHE:
+                cache.set("item_name", cache_name, item_name)
+            return item_name
+        if STEAM_CACHE:
+            negative_cache.set("item_name", cache_name, True)
+        return None
+
+
+async def _search_item_names(name, appid, timeout):
+    """Internal method which searches the market's JSON search for an item, every item it returns is kept in
+    market_cache so that looking any of them up later doesn't need a request
+
+    Returns:
+        the url name of the first item found (str), or None if none were found
+
+    Raises:
+        ValueError: if the search failed
+    """
+    url = "https://steamcommunity.com/market/search/render/?norender=1&count=%s&query=%s" % (STEAM_MARKET_SEARCH_COUNT, parse.quote(name))
+    if appid != "":
+        url += "&appid=" + appid
+    data = await _fetch(url, timeout=timeout, fmt="json")
+    if not isinstance(data, dict) or not data.get("success"):
+        raise ValueError("failed to search the market for %s" % name)
+
+    results = data.get("results") or []
+    if STEAM_CACHE:
+        for result in results:
+            asset = result.get("asset_description") or {}
+            item_appid = str(asset.get("appid", appid))
+            hash_name = result["hash_name"]
+            market_cache.set("item_name", item_appid + "::" + result.get("name", hash_name), hash_name)
+            market_cache.set("item_name", item_appid + "::" + hash_name, hash_name)
+            market_cache.set("market_asset", item_appid + "::" + hash_name, dict(asset, app_icon=result.get("app_icon", "???")))
+    return results[0]["hash_name"] if len(results) > 0 else None
+
+
+def _parse_item_name(text):
+    """Internal method which parses the first item's name out of a market search, see get_item_name"""
+    soup = _make_soup(text, _class_strainer("span", "market_listing_item_name"))
+
+    namesoup = soup.find("span", {"class": "market_listing_item_name"})
+    if namesoup is not None:
+        return namesoup.get_text()
+    return None
 
 
 async def get_wishlist(userid, cc="gb", timeout=10, discount_only=True, be_specific=False):
     if not is_integer(userid):
         userid = await search_for_userid(userid, be_specific=be_specific)
     if userid is not None:
-        print(userid)
-        async with aiohttp.ClientSession() as session:
-            URL = "https://store.steampowered.com/wishlist/profiles/" + userid + "/?cc=" + cc
-            print(URL)
-            resp = await session.get("https://store.steampowered.com/wishlist/profiles/" + userid + "/wishlistdata/?cc=" + cc, timeout=timeout)
-            data = await resp.json()
-
-            games = []
-
-            for appid in data:
-                game = data[appid]
-                name = game.get("name", "???")
-                link = "https://store.steampowered.com/app/%s/" % appid
-                price = "???"
-                subs = game.get("subs", [])
-                if len(subs) > 0:
-                    html = None
-                    discounted = False
-                    for sub in subs:
-                        if "discount_block" in sub:
-                            html = sub["discount_block"]
-                            discounted = sub.get("discount_pct", 0) > 0
-                            break
-
-                    if html is not None:
-                        soup = BeautifulSoup(html, "html.parser")
-                        price_soup = soup.find("div", {"class": "discount_final_price"})
-                        if price_soup is not None:
-                            price = price_soup.get_text()
-
-                        if discounted:
-                            original_price = "???"
-                            original_price_soup = soup.find("div", {"class": "discount_original_price"})
-                            if original_price_soup is not None:
-                                original_price = original_price_soup.get_text()
-
-                            discount_percent = "??%"
-                            discount_percent_soup = soup.find("div", {"class": "discount_pct"})
-                            if discount_percent_soup is not None:
-                                discount_percent = discount_percent_soup.get_text()
-
-                            games.append((name, link, original_price, price, discount_percent))
-                            continue
-
-                if not discount_only:
-                    games.append((name, link, price))
-
-            return UserWishlist(games)
+        data = await _fetch("https://store.steampowered.com/wishlist/profiles/" + userid + "/wishlistdata/?cc=" + cc, timeout=timeout, fmt="json")
+
+        return await _parse(_parse_wishlist, data, discount_only)
+
+
+def _parse_wishlist(data, discount_only):
+    """Internal method which parses the prices out of a user's wishlist data, see get_wishlist"""
+    games = []
+
+    for appid in data:
+        game = data[appid]
+        name = game.get("name", "???")
+        link = "https://store.steampowered.com/app/%s/" % appid
+        price = "???"
+        subs = game.get("subs", [])
+        if len(subs) > 0:
+            html = None
+            discounted = False
+            for sub in subs:
+                if "discount_block" in sub:
+                    html = sub["discount_block"]
+                    discounted = sub.get("discount_pct", 0) > 0
+                    break
+
+            if html is not None:
+                soup = _make_soup(html)
+                price_soup = soup.find("div", {"class": "discount_final_price"})
+                if price_soup is not None:
+                    price = price_soup.get_text()
+
+                if discounted:
+                    original_price = "???"
+                    original_price_soup = soup.find("div", {"class": "discount_original_price"})
+                    if original_price_soup is not None:
+                        original_price = original_price_soup.get_text()
+
+                    discount_percent = "??%"
+                    discount_percent_soup = soup.find("div", {"class": "discount_pct"})
+                    if discount_percent_soup is not None:
+                        discount_percent = discount_percent_soup.get_text()
+
+                    games.append((name, link, original_price, price, discount_percent))
+                    continue
+
+        if not discount_only:
+            games.append((name, link, price))
+
+    return UserWishlist(games)
 
 
 async def get_screenshots(username, timeout=10, limit=-1):
@@ -1623,24 +3993,32 @@ async def get_screenshots(username, timeout=10, limit=-1):
         """
     ulinks = await search_for_users(username, limit=1)
     if len(ulinks) > 0:
-        async with aiohttp.ClientSession() as session:
-            resp = await session.get(ulinks[0][0] + "/screenshots/", timeout=timeout)
-            text = await resp.text()
-            soup = BeautifulSoup(text, "html.parser")
-
-            links = []
-            screensoups = soup.find_all("a", {"class": "profile_media_item"})
-            for ssoup in screensoups:
-                imgsoup = ssoup.find("img")
-                if imgsoup is not None:
-                    links.append(imgsoup.get("src"))
-                    if len(links) >= limit > 0:
-                        break
-            return links
+        text = await _fetch(ulinks[0][0] + "/screenshots/", timeout=timeout)
+        return await _parse(_parse_screenshots, text, limit)
     else:
         return None
 
 
+def _parse_screenshots(text, limit):
+    """Internal method which parses the screenshot links out of a user's screenshots page, see get_screenshots"""
+    return _parse_cut(_parse_screenshot_rows, text, "a", "profile_media_item", limit)
+
+
+def _parse_screenshot_rows(text, limit):
+    """Internal method which parses the screenshot links out of (part of) a screenshots page, see _parse_screenshots"""
+    soup = _make_soup(text, _class_strainer("a", "profile_media_item"))
+
+    links = []
+    screensoups = soup.find_all("a", {"class": "profile_media_item"})
+    for ssoup in screensoups:
+        imgsoup = ssoup.find("img")
+        if imgsoup is not None:
+            links.append(imgsoup.get("src"))
+            if len(links) >= limit > 0:
+                break
+    return links
+
+
 async def top_game_playercounts(limit=10, timeout=10):
     """Gets the top games on steam right now by player count
 
@@ -1650,33 +4028,45 @@ async def top_game_playercounts(limit=10, timeout=10):
     Returns:
         A list of tuples in the format (current_players (str), peak_players (str), game_name (str), game_link (str))
         """
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/stats", timeout=timeout)
-        text = await resp.text()
-        soup = BeautifulSoup(text, "html.parser")
-
-        stats = []
-        ssoups = soup.find_all("tr", {"class": "player_count_row"})
-        for subsoup in ssoups:
-            linksoup = subsoup.find("a", {"class": "gameLink"})
-            name = linksoup.get_text()
-            link = linksoup.get("href")
-            stuff = subsoup.find_all("span", {"class": "currentServers"})
-            if len(stuff) > 0:
-                current_players = stuff[0].get_text()
-                peak_players = stuff[1].get_text()
-                stats.append((current_players, peak_players, name, link))
-                if len(stats) >= limit > 0:
-                    break
-        return stats
+    stats = await _single_flight(("top_game_playercounts", limit), _load_top_game_playercounts, limit, timeout)
+    return list(stats)
+
+
+async def _load_top_game_playercounts(limit, timeout):
+    """Internal method which downloads and parses the stats page, see top_game_playercounts"""
+    text = await _fetch("https://store.steampowered.com/stats", timeout=timeout)
+    return await _parse(_parse_playercounts, text, limit)
+
+
+def _parse_playercounts(text, limit):
+    """Internal method which parses the rows of the stats page, see top_game_playercounts"""
+    return _parse_cut(_parse_playercount_rows, text, "tr", "player_count_row", limit)
+
+
+def _parse_playercount_rows(text, limit):
+    """Internal method which parses the rows of (part of) the stats page, see _parse_playercounts"""
+    soup = _make_soup(text, _class_strainer("tr", "player_count_row"))
+
+    stats = []
+    ssoups = soup.find_all("tr", {"class": "player_count_row"})
+    for subsoup in ssoups:
+        linksoup = subsoup.find("a", {"class": "gameLink"})
+        name = linksoup.get_text()
+        link = linksoup.get("href")
+        stuff = subsoup.find_all("span", {"class": "currentServers"})
+        if len(stuff) > 0:
+            current_players = stuff[0].get_text()
+            peak_players = stuff[1].get_text()
+            stats.append((current_players, peak_players, name, link))
+            if len(stats) >= limit > 0:
+                break
+    return stats
 
 async def get_playercount(appid, timeout=10):
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://api.steampowered.com/ISteamUserStats/GetNumberOfCurrentPlayers/v1/?key=%s&format=json&appid=%s" % (STEAM_KEY, appid), timeout=timeout)
-        data = await resp.json()
+    data = await _fetch("https://api.steampowered.com/ISteamUserStats/GetNumberOfCurrentPlayers/v1/?key=%s&format=json&appid=%s" % (STEAM_KEY, appid), timeout=timeout, fmt="json")
 
-        if "response" in data:
-            return data["response"].get("player_count")
+    if "response" in data:
+        return data["response"].get("player_count")
 
 async def search_for_playercount(appid, timeout=10, be_specific=False):
     if not be_specific:
@@ -1684,24 +4074,12 @@ async def search_for_playercount(appid, timeout=10, be_specific=False):
     else:
         appname = appid
 
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/stats", timeout=timeout)
-        text = await resp.text()
-        soup = BeautifulSoup(text, "html.parser")
-
-        number = 0
-        ssoups = soup.find_all("tr", {"class": "player_count_row"})
-        for subsoup in ssoups:
-            number += 1
-            linksoup = subsoup.find("a", {"class": "gameLink"})
-            name = linksoup.get_text()
-            link = linksoup.get("href")
-            if link.split("/")[-2] == appid:
-                stuff = subsoup.find_all("span", {"class": "currentServers"})
-                if len(stuff) > 0:
-                    current_players = stuff[0].get_text()
-                    peak_players = stuff[1].get_text()
-                    return (name, current_players, peak_players, number, link)
+    text = await _fetch("https://store.steampowered.com/stats", timeout=timeout)
+    stats = await _parse(_parse_playercounts, text, -1)
+
+    for number, (current_players, peak_players, name, link) in enumerate(stats, 1):
+        if link.split("/")[-2] == appid:
+            return (name, current_players, peak_players, number, link)
 
     if appid is None:
         return None
@@ -1719,19 +4097,17 @@ async def steam_user_data(timeout=10):
         timeout (int, optional): The amount of time before aiohttp raises a timeout error
     Returns:
         A tuple containing (min_users (int), max_users (int), current_users (int))"""
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get("https://store.steampowered.com/stats/userdata.json", timeout=timeout)
-        data = await resp.json()
-        data = data[0]["data"]
+    data = await _fetch("https://store.steampowered.com/stats/userdata.json", timeout=timeout, fmt="json")
+    data = data[0]["data"]
 
-        min_users = -1
-        max_users = -1
-        for pair in data:
-            if min_users == -1 or pair[1] < min_users:
-                min_users = pair[1]
-            if max_users == -1 or pair[1] > max_users:
-                max_users = pair[1]
-        return min_users, max_users, data[-1][1]
+    min_users = -1
+    max_users = -1
+    for pair in data:
+        if min_users == -1 or pair[1] < min_users:
+            min_users = pair[1]
+        if max_users == -1 or pair[1] > max_users:
+            max_users = pair[1]
+    return min_users, max_users, data[-1][1]
 
 
 
@@ -1752,11 +4128,9 @@ async def get_user_achievements(username, gameid, timeout=10, be_specific=False)
         gamename = "???"
     _check_key_set()
     if username is not None and gameid is not None:
-        async with aiohttp.ClientSession() as session:
-            resp = await session.get("https://api.steampowered.com/ISteamUserStats/GetPlayerAchievements/v0001/?appid=" + gameid + "&key=" + STEAM_KEY + "&steamid=" + username, timeout=timeout)
-            data = await resp.json()
-            if "playerstats" in data and "achievements" in data["playerstats"]:
-                return UserAchievements(gameid, gamename, data["playerstats"]["achievements"])
+        data = await _fetch("https://api.steampowered.com/ISteamUserStats/GetPlayerAchievements/v0001/?appid=" + gameid + "&key=" + STEAM_KEY + "&steamid=" + username, timeout=timeout, fmt="json")
+        if "playerstats" in data and "achievements" in data["playerstats"]:
+            return UserAchievements(gameid, gamename, data["playerstats"]["achievements"])
 
 
 async def get_global_achievements(gameid, timeout=10):
@@ -1771,12 +4145,18 @@ async def get_global_achievements(gameid, timeout=10):
     if not is_integer(gameid):
         gameid, gamename = await get_app(gameid, timeout=timeout)
     if gameid is not None:
-        async with aiohttp.ClientSession() as session:
-            resp = await session.get("https://steamcommunity.com/stats/" + gameid + "/achievements/", timeout=timeout)
-            text = await resp.text()
-            soup = BeautifulSoup(text, "html.parser")
+        return await _single_flight(("get_global_achievements", gameid), _load_global_achievements, gameid, timeout)
+
+
+async def _load_global_achievements(gameid, timeout):
+    """Internal method which downloads and parses a game's achievements page, see get_global_achievements"""
+    text = await _fetch("https://steamcommunity.com/stats/" + gameid + "/achievements/", timeout=timeout)
+    return await _parse(_parse_global_achievements, text)
 
-            return GlobalAchievements(soup)
+
+def _parse_global_achievements(text):
+    """Internal method which parses a game's achievements page, see get_global_achievements"""
+    return GlobalAchievements(_make_soup(text, _class_strainer("div", "achieveRow")))
 
 
 async def count_user_removed(username, timeout=10, be_specific=False):
@@ -1786,19 +4166,17 @@ async def count_user_removed(username, timeout=10, be_specific=False):
     if username is None:
         return
 
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get(
-            'https://removed.timekillerz.eu/content/steambot-server.php?steamid=' + parse.quote(username),
-            timeout=timeout
-        )
-
-        _data = await resp.json()
-        data = _data['response']
+    _data = await _fetch(
+        'https://removed.timekillerz.eu/content/steambot-server.php?steamid=' + parse.quote(username),
+        timeout=timeout,
+        fmt="json"
+    )
+    data = _data['response']
 
-        try:
-            return data['removed_count'], data['game_count'], data['total_removed_count'], data['players'][0]['personaname']
-        except KeyError:
-            return  # don't want to propagate the error
+    try:
+        return data['removed_count'], data['game_count'], data['total_removed_count'], data['players'][0]['personaname']
+    except KeyError:
+        return  # don't want to propagate the error
 
 
 def convert_to_table(items, columns, seperator="|", spacing=1):
@@ -0,0 +1,99 @@
+"""
+This example times how long it takes to parse an item's market listings page, comparing the way steamsearch
+used to parse it (the whole page with BeautifulSoup, then searching str(soup)) with aiosteamsearch._parse_item,
+which finds what it needs straight from the page's bytes. It doesn't make any requests.
+
+usage: python market_parse_benchmark.py [rows] [repeats]
+"""
+
+import json
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+import aiosteamsearch
+
+ASSETS = {"730": {"2": {"123": {
+    "tradable": 1, "name": "AK-47 | Redline", "app_icon": "https://example.com/icon.jpg", "icon_url": "abcDEF123",
+    "type": "Classified Rifle", "actions": [{"link": "steam://inspect", "name": "Inspect in Game..."}],
+    "descriptions": [{"type": "html", "value": "Exterior: Field-Tested"}, {"type": "html", "value": "<b>Tough</b> &amp; red"}]
+}}}}
+
+
+def build_page(rows):
+    """Builds a listings page with the price and assets surrounded by `rows` listing rows either side"""
+    filler = "".join('<div class="market_listing_row"><span class="market_listing_item_name">row {0}</span>'
+                     '<a href="/market/listings/730/{0}">link</a></div>\n'.format(i) for i in range(rows))
+    return ('<html><head><script>\nvar g_rgAssets = {0};\nvar g_rgListingInfo = [];\n</script></head><body>{1}'
+            '<span class="market_listing_price market_listing_price_with_publisher_fee_only">\n\t\t£1.23\t</span>'
+            '{1}</body></html>').format(json.dumps(ASSETS), filler).encode("utf-8")
+
+
+def old_parse_item(page):
+    """The listings page parser from before _extract_market_page, returns the fields ItemResult sets"""
+    soup = BeautifulSoup(page.decode("utf-8"), "html.parser")
+    result = {}
+
+    price = soup.find("span", {"class": "market_listing_price_with_publisher_fee_only"})
+    if price is not None:
+        rawprice = price.get_text().replace("\n", "").replace("\t", "").replace("\r", "")
+        before = ""
+        after = ""
+        while len(rawprice) > 0 and rawprice[0] not in "0123456789.,":
+            before += rawprice[0]
+            rawprice = rawprice[1:]
+        while len(rawprice) > 0 and rawprice[-1] not in "0123456789.,":
+            after = rawprice[-1] + after
+            rawprice = rawprice[:-1]
+        result["price"] = rawprice
+        result["currency"] = aiosteamsearch.CURRENCY_MAP.get(before.replace(" ", ""), after.replace(" ", ""))
+
+    text = str(soup)
+    index = text.find("var g_rgAssets")
+    jsontext = text[index:text.find("\n", index)]
+    while jsontext[0] != "{" and jsontext[0] != "[":
+        jsontext = jsontext[1:]
+    while jsontext[-1] != "}" and jsontext[-1] != "]":
+        jsontext = jsontext[:-1]
+
+    data = json.loads(jsontext)
+    raw = {}
+    for k1 in data:
+        for k2 in data[k1]:
+            for k3 in data[k1][k2]:
+                if "tradable" in data[k1][k2][k3] and data[k1][k2][k3]["tradable"] == 1:
+                    raw = data[k1][k2][k3]
+                    break
+
+    result["name"] = raw.get("name", "???")
+    result["icon"] = "https://steamcommunity-a.akamaihd.net/economy/image/" + raw.get("icon_url", "???")
+    result["type"] = raw.get("type", "???")
+    result["desc"] = [BeautifulSoup(x.get("value", ""), "html.parser").get_text() for x in raw.get("descriptions", [])]
+    return result
+
+
+def best_time(func, page, repeats):
+    """Returns the result of func(page) and the quickest of `repeats` runs in milliseconds"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(page)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+page = build_page(rows)
+
+old, old_ms = best_time(old_parse_item, page, repeats)
+new, new_ms = best_time(aiosteamsearch._parse_item, page, repeats)
+
+print("page size: {0} bytes ({1} rows)".format(len(page), rows * 2))
+print("BeautifulSoup + str(soup): {0:.2f}ms".format(old_ms))
+print("_parse_item:               {0:.2f}ms ({1:.0f}x faster)".format(new_ms, old_ms / new_ms))
+for field in sorted(old):
+    if old[field] != getattr(new, field):
+        print("MISMATCH {0}: {1!r} != {2!r}".format(field, old[field], getattr(new, field)))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# steamsearch isn't a package, so make the modules at the root of the repo importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
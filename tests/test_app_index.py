@@ -0,0 +1,123 @@
+"""
+Checks that AppIndex and CompactAppIndex resolve the same names, and that get_app uses the local index before
+searching the store
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import aiosteamsearch
+
+APPS = [
+    (400, "Portal"),
+    (620, "Portal 2"),
+    (730, "Counter-Strike 2"),
+    (4000, "Garry's Mod"),
+    (1091500, "Cyberpunk 2077"),
+    (1091501, "Cyberpunk 2077"),  # a second app with the same name, the first one is used
+    (10, "Counter-Strike"),
+    (5, "!!!"),  # normalizes to nothing, so it can't be searched for
+]
+
+
+@pytest.fixture
+def app_list(tmp_path):
+    path = str(tmp_path / "apps.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"applist": {"apps": [{"appid": appid, "name": name} for appid, name in APPS]}}, f)
+    return path
+
+
+@pytest.fixture(params=["AppIndex", "CompactAppIndex"])
+def index(request, app_list, tmp_path):
+    if request.param == "AppIndex":
+        yield aiosteamsearch.AppIndex.from_file(app_list)
+        return
+    path = str(tmp_path / "apps.idx")
+    aiosteamsearch.compact_app_index(app_list, path)
+    index = aiosteamsearch.CompactAppIndex(path)
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    """Restores the local app index after a test loads one"""
+    monkeypatch.setattr(aiosteamsearch, "app_index", None)
+    yield
+    aiosteamsearch._set_app_index(None)
+
+
+def test_exact_and_prefix_matches(index):
+    assert len(index) == 6
+    assert index.search("Portal") == ("400", "Portal")
+    assert index.search("PORTAL: 2") == ("620", "Portal 2")
+    assert index.search("cyberpunk 2077") == ("1091500", "Cyberpunk 2077")
+    assert index.search("counter") == ("10", "Counter-Strike")  # the shortest name starting with it
+    assert index.search("garry", min_score=1, prefix_limit=0) is None
+    assert index.search("half-life", min_score=1) is None
+    assert index.search("!!!") is None
+
+
+def test_titles(index):
+    assert index.get_title("4000") == "Garry's Mod"
+    assert index.get_title(1091501) == "Cyberpunk 2077"
+    assert index.get_title("1") is None
+    assert index.get_title("not an appid") is None
+
+
+def test_fuzzy_matches(app_list):
+    index = aiosteamsearch.AppIndex.from_file(app_list)
+    assert index.search("garys mod") == ("4000", "Garry's Mod")
+    assert index.search("cyberpnk 2077") == ("1091500", "Cyberpunk 2077")
+    assert index.search("garys mod", min_score=1) is None
+    assert index.fuzzy_search("a completely different game") is None
+    # with every trigram too common, candidates are still found from the rarest one
+    assert index.fuzzy_search("garys mod", max_postings=0) == ("4000", "Garry's Mod")
+
+
+def test_compact_index_rejects_other_files(app_list):
+    with pytest.raises(ValueError):
+        aiosteamsearch.CompactAppIndex(app_list)
+
+
+def test_load_app_index_picks_the_format(app_list, tmp_path, loaded):
+    assert isinstance(aiosteamsearch.load_app_index(app_list), aiosteamsearch.AppIndex)
+    path = str(tmp_path / "apps.idx")
+    aiosteamsearch.compact_app_index(app_list, path)
+    compact = aiosteamsearch.load_app_index(path)
+    assert isinstance(compact, aiosteamsearch.CompactAppIndex) and aiosteamsearch.app_index is compact
+    aiosteamsearch.load_app_index(None)
+    assert aiosteamsearch.app_index is None and compact._map.closed
+
+
+def test_get_app_checks_the_index_first(app_list, monkeypatch, loaded):
+    searches = []
+
+    async def search_app(name, timeout):
+        searches.append(name)
+        return None, None
+
+    monkeypatch.setattr(aiosteamsearch, "_search_app", search_app)
+    monkeypatch.setattr(aiosteamsearch, "cache", aiosteamsearch.SteamCache())
+    monkeypatch.setattr(aiosteamsearch, "negative_cache", aiosteamsearch.SteamCache())
+    aiosteamsearch.load_app_index(app_list)
+
+    async def run():
+        return [await aiosteamsearch.get_app(name) for name in ("portal 2", "garys mod", "half-life")]
+
+    assert asyncio.run(run()) == [("620", "Portal 2"), ("4000", "Garry's Mod"), (None, None)]
+    assert searches == ["half-life"]
+
+
+def test_write_file_leaves_no_temporary_files(tmp_path):
+    path = str(tmp_path / "apps.json")
+    aiosteamsearch._write_file(path, "first")
+    aiosteamsearch._write_file(path, b"second")
+    with pytest.raises(AttributeError):
+        aiosteamsearch._write_file(path, None)
+    with open(path, "rb") as f:
+        assert f.read() == b"second"
+    assert [p.name for p in tmp_path.iterdir()] == ["apps.json"]
@@ -0,0 +1,159 @@
+"""
+Checks the LRU and TTL behaviour of SteamCache, that SteamSQLiteCache keeps results on disk, and that lookups which
+found nothing are remembered by the negative cache
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+import aiosteamsearch
+
+
+class Clock:
+    """Stands in for the time module in aiosteamsearch, so that results can be expired without waiting"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(aiosteamsearch, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    cache = aiosteamsearch.SteamSQLiteCache(str(tmp_path / "cache.db"), ttls={"gameid": 60})
+    yield cache
+    cache.close()
+
+
+def test_evicts_least_recently_used():
+    cache = aiosteamsearch.SteamCache(max_size=2)
+    cache.set("gameid", "a", 1)
+    cache.set("gameid", "b", 2)
+    assert cache.get("gameid", "a") == 1  # b is now the least recently used
+    cache.set("gameid", "c", 3)
+    assert cache.get("gameid", "b") is None
+    assert (cache.get("gameid", "a"), cache.get("gameid", "c")) == (1, 3)
+    assert cache.stats()["gameid"] == {"hits": 3, "misses": 1, "evictions": 1, "expired": 0, "size": 2}
+
+
+def test_unbounded_cache_never_evicts():
+    cache = aiosteamsearch.SteamCache(max_size=0)
+    for i in range(100):
+        cache.set("gameid", i, i)
+    assert cache.count() == 100
+
+
+def test_results_expire_after_their_namespaces_ttl(clock):
+    cache = aiosteamsearch.SteamCache(ttls={"gameid": 60})
+    cache.set("gameid", "a", 1)
+    cache.set("userid", "a", 2)
+    cache.set("gameid", "b", 3, ttl=120)
+    clock.now += 60
+    assert cache.get("gameid", "a", "missing") == "missing"
+    assert cache.get("userid", "a") == 2  # namespaces without a TTL never expire
+    assert cache.get("gameid", "b") == 3
+    assert cache.stats()["gameid"]["expired"] == 1
+
+
+def test_compact_removes_only_expired_results(clock):
+    cache = aiosteamsearch.SteamCache(ttls={"gameid": 60})
+    cache.set("gameid", "a", 1)
+    cache.set("gameid", "b", 2, ttl=120)
+    cache.set("userid", "a", 3)
+    clock.now += 90
+    assert cache.compact() == 1
+    assert cache.count() == 2 and cache.count("gameid") == 1
+
+
+def test_clear_namespace():
+    cache = aiosteamsearch.SteamCache()
+    cache.set("gameid", "a", 1)
+    cache.set("userid", "a", 2)
+    assert cache.clear("gameid") == 1
+    assert cache.count() == 1 and cache.get("userid", "a") == 2
+
+
+def test_sqlite_cache_survives_restarts(sqlite_cache):
+    sqlite_cache.set("gameid", "portal", ("400", "Portal"))
+    sqlite_cache.set("vanity", "nobody", True)  # not one of the namespaces kept on disk
+    sqlite_cache.close()
+
+    reopened = aiosteamsearch.SteamSQLiteCache(sqlite_cache.path)
+    try:
+        assert reopened.get("gameid", "portal") == ("400", "Portal")
+        assert reopened.get("vanity", "nobody") is None
+        assert reopened.stats()["gameid"]["disk_hits"] == 1
+    finally:
+        reopened.close()
+
+
+def test_sqlite_cache_expires_on_disk(clock, sqlite_cache):
+    sqlite_cache.set("gameid", "portal", ("400", "Portal"))
+    sqlite_cache.set("userid", "someone", "7656")
+    sqlite_cache.flush()
+    clock.now += 60
+    sqlite_cache._data.clear()  # forget the results in memory, so they're read from disk
+    assert sqlite_cache.get("gameid", "portal") is None
+    assert sqlite_cache.count() == 1
+
+
+def test_sqlite_compact_counts_each_result_once(clock, sqlite_cache):
+    sqlite_cache.set("gameid", "in memory and on disk", ("1", "a"))
+    sqlite_cache.set("gameid", "only on disk", ("2", "b"))
+    sqlite_cache.set("gameid", "kept", ("3", "c"), ttl=120)
+    sqlite_cache.flush()
+    del sqlite_cache._data[("gameid", "only on disk")]
+    clock.now += 60
+    assert sqlite_cache.compact() == 2
+    assert sqlite_cache.count() == 1
+
+
+def test_sqlite_cache_reads_disk_off_the_event_loop(sqlite_cache, monkeypatch):
+    sqlite_cache.set("gameid", "portal", ("400", "Portal"))
+    sqlite_cache.set("userid", "someone", "7656")
+    sqlite_cache.flush()
+    sqlite_cache._data.clear()
+    threads = []
+    read = sqlite_cache._read
+
+    def record(*args):
+        threads.append(threading.current_thread())
+        return read(*args)
+
+    monkeypatch.setattr(sqlite_cache, "_read", record)
+
+    async def run():
+        return await sqlite_cache.aget("gameid", "portal"), await sqlite_cache.aget("vanity", "nobody", "missing")
+
+    assert asyncio.run(run()) == (("400", "Portal"), "missing")
+    assert asyncio.run(sqlite_cache.aget("gameid", "portal")) == ("400", "Portal")  # now it's in memory too
+    assert len(threads) == 1 and threads[0] is not threading.current_thread()
+    assert asyncio.run(sqlite_cache.acount()) == 2
+
+
+def test_failed_lookups_are_remembered(monkeypatch):
+    requests = []
+
+    async def fetch(url, timeout=10, fmt="text", headers=None):
+        requests.append(url)
+        return {"response": {"success": 42}}
+
+    monkeypatch.setattr(aiosteamsearch, "_fetch", fetch)
+    monkeypatch.setattr(aiosteamsearch, "STEAM_KEY", "key")
+    monkeypatch.setattr(aiosteamsearch, "negative_cache", aiosteamsearch.SteamCache(ttls={"vanity": 60}))
+    assert asyncio.run(aiosteamsearch.get_user_id("nobody")) is None
+    assert asyncio.run(aiosteamsearch.get_user_id("nobody")) is None
+    assert len(requests) == 1
+    assert aiosteamsearch.negative_cache_stats()["vanity"]["hits"] == 1
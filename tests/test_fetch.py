@@ -0,0 +1,185 @@
+"""
+Checks that identical requests made at the same time share one request, and that each host's rate limit backs off
+when it responds with 429 or 503
+"""
+
+import asyncio
+import email.utils
+import time
+
+import pytest
+
+import aiosteamsearch
+
+
+class Response:
+    def __init__(self, status, body="ok", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def text(self):
+        return self.body
+
+
+class Session:
+    """Stands in for the shared aiohttp session, responding to each request with the next of responses"""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = Session([])
+
+    async def startup():
+        return session
+
+    monkeypatch.setattr(aiosteamsearch, "startup", startup)
+    monkeypatch.setattr(aiosteamsearch, "_buckets", {})
+    monkeypatch.setattr(aiosteamsearch, "STEAM_RATE_LIMITS", {})
+    monkeypatch.setattr(aiosteamsearch, "STEAM_DEFAULT_RATE_LIMIT", None)
+    return session
+
+
+def test_concurrent_calls_share_one_call():
+    calls = []
+
+    async def slow(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return [value]
+
+    async def run():
+        aiosteamsearch.reset_coalesce_stats()
+        results = await asyncio.gather(*[aiosteamsearch._single_flight(("slow", 1), slow, 1) for _ in range(5)],
+                                       aiosteamsearch._single_flight(("slow", 2), slow, 2))
+        after = await aiosteamsearch._single_flight(("slow", 1), slow, 1)
+        return results, after
+
+    results, after = asyncio.run(run())
+    assert results == [[1]] * 5 + [[2]]
+    assert results[0] is results[4]  # every caller gets the very same result
+    assert after == [1] and calls == [1, 2, 1]  # calls which have finished aren't reused
+    assert aiosteamsearch.coalesce_stats() == {"calls": 3, "coalesced": 4, "in_flight": 0}
+
+
+def test_errors_are_shared_and_not_kept():
+    calls = []
+
+    async def failing():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        raise KeyError("missing")
+
+    async def run():
+        return await asyncio.gather(*[aiosteamsearch._single_flight(("failing",), failing) for _ in range(3)],
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, KeyError) for result in results) and len(calls) == 1
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_cancelling_one_caller_doesnt_cancel_the_others():
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(aiosteamsearch._single_flight(("cancel",), slow))
+        second = asyncio.ensure_future(aiosteamsearch._single_flight(("cancel",), slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_rate_must_be_positive():
+    for rate in (0, -1):
+        with pytest.raises(ValueError):
+            aiosteamsearch._TokenBucket(rate, 1)
+        with pytest.raises(ValueError):
+            aiosteamsearch.set_rate_limit("example.com", rate)
+    with pytest.raises(ValueError):
+        aiosteamsearch._TokenBucket(1, 0)
+    assert "example.com" not in aiosteamsearch.STEAM_RATE_LIMITS
+
+
+def test_bucket_backs_off_and_recovers(monkeypatch):
+    monkeypatch.setattr(aiosteamsearch, "STEAM_RATE_DECREASE", 0.5)
+    monkeypatch.setattr(aiosteamsearch, "STEAM_RATE_INCREASE", 0.25)
+    monkeypatch.setattr(aiosteamsearch, "STEAM_RATE_MIN_FRACTION", 1 / 4)
+    bucket = aiosteamsearch._TokenBucket(8.0, 4)
+    bucket.throttle()
+    assert (bucket.rate, bucket.tokens, bucket.throttled) == (4.0, 0, 1)
+    for _ in range(3):
+        bucket.throttle()
+    assert bucket.rate == 2.0  # never below max_rate * STEAM_RATE_MIN_FRACTION
+    bucket.succeeded()
+    assert bucket.rate == 4.0
+    for _ in range(5):
+        bucket.succeeded()
+    assert bucket.rate == 8.0  # never above max_rate
+
+
+def test_bucket_waits_for_retry_after():
+    bucket = aiosteamsearch._TokenBucket(1000.0, 1)
+
+    async def run():
+        await bucket.acquire()
+        bucket.throttle(retry_after=0.05)
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.045
+    assert bucket.requests == 2 and bucket.queued == 0
+
+
+def test_parse_retry_after():
+    assert aiosteamsearch._parse_retry_after(None) is None
+    assert aiosteamsearch._parse_retry_after("120") == 120.0
+    assert aiosteamsearch._parse_retry_after("-5") == 0.0
+    assert aiosteamsearch._parse_retry_after("soon") is None
+    later = aiosteamsearch._parse_retry_after(email.utils.formatdate(time.time() + 60, usegmt=True))
+    assert 55 <= later <= 60
+
+
+def test_throttled_requests_are_retried(session):
+    aiosteamsearch.set_rate_limit("example.com", 1000.0)
+    session.responses = [Response(429, headers={"Retry-After": "0"}), Response(503), Response(200, "page")]
+    assert asyncio.run(aiosteamsearch._fetch_uncoalesced("https://example.com/page")) == "page"
+    stats = aiosteamsearch.rate_limit_stats()["example.com"]
+    assert (stats["requests"], stats["throttled"], stats["max_rate"]) == (3, 2, 1000.0)
+    assert stats["rate"] < 1000.0
+
+
+def test_rate_limited_after_every_retry(session, monkeypatch):
+    monkeypatch.setattr(aiosteamsearch, "STEAM_RATE_RETRIES", 1)
+    session.responses = [Response(429, headers={"Retry-After": "0"}), Response(429, headers={"Retry-After": "0"})]
+    with pytest.raises(aiosteamsearch.SteamRateLimited):
+        asyncio.run(aiosteamsearch._fetch_uncoalesced("https://example.com/page"))
+    assert session.requests == 2
+
+
+def test_negative_retries_still_make_one_request(session, monkeypatch):
+    monkeypatch.setattr(aiosteamsearch, "STEAM_RATE_RETRIES", -1)
+    session.responses = [Response(429, headers={"Retry-After": "0"})]
+    with pytest.raises(aiosteamsearch.SteamRateLimited):
+        asyncio.run(aiosteamsearch._fetch_uncoalesced("https://example.com/page"))
+    session.responses = [Response(200, "page")]
+    assert asyncio.run(aiosteamsearch._fetch_uncoalesced("https://example.com/page")) == "page"
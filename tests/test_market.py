@@ -0,0 +1,107 @@
+"""
+Checks that get_item and get_items give prices in the currency asked for without losing a cent, and that the
+items found by the market's search are kept apart from the cached names
+"""
+
+import asyncio
+
+import pytest
+
+import aiosteamsearch
+
+
+@pytest.fixture
+def items(monkeypatch):
+    """Stands in for the market, mapping item names to the price priceoverview gives for them"""
+    items = {}
+
+    async def load_item(appid, item_name, currency, timeout, full):
+        if item_name in items:
+            result = aiosteamsearch.ItemResult(items[item_name], asset={"name": item_name})
+            result.currency = currency  # priceoverview gives the price in the currency it was asked for
+            return result
+
+    async def get_rates(timeout=10):
+        raise AssertionError("prices already in the currency asked for aren't converted")
+
+    monkeypatch.setattr(aiosteamsearch, "_load_item", load_item)
+    monkeypatch.setattr(aiosteamsearch, "get_rates", get_rates)
+    return items
+
+
+@pytest.mark.parametrize("rawprice, currency, symbol, price", [
+    ("£0.29", "GBP", "£", "£0.29"),
+    ("£1.15", "GBP", "£", "£1.15"),
+    ("$19.99", "USD", "$", "$19.99"),
+])
+def test_same_currency_price_is_kept(items, rawprice, currency, symbol, price):
+    items["item"] = rawprice
+    result = asyncio.run(aiosteamsearch.get_item("730", "item", currency=currency, currency_symbol=symbol))
+    assert (result.price, result.currency) == (price, currency)
+
+
+def test_get_items_keeps_same_currency_prices(items):
+    items.update({"a": "£0.29", "b": "£1.15"})
+
+    async def run():
+        return {name: result and result.price
+                async for appid, name, result in aiosteamsearch.get_items([("730", "a"), ("730", "b"), ("730", "c")])}
+
+    assert asyncio.run(run()) == {"a": "£0.29", "b": "£1.15", "c": None}
+
+
+def test_update_price_doesnt_need_rates_for_the_same_currency(items):
+    result = aiosteamsearch.ItemResult("£0.29")
+
+    async def run():
+        await result.update_price("GBP", "£")  # get_rates raises, but it isn't needed
+
+    asyncio.run(run())
+    assert result.price == "£0.29"
+
+
+def test_conversions_are_rounded():
+    rates = {"GBP": 1, "USD": 1.25}
+    assert aiosteamsearch._convert(0.29, "GBP", "GBP", rates) == 0.29
+    assert aiosteamsearch._convert(1.15, "GBP", "GBP", rates) == 1.15
+    assert aiosteamsearch._convert(0.8, "GBP", "USD", rates) == 1.0
+    assert aiosteamsearch._convert(19.99, "USD", "GBP", rates) == 15.99
+
+
+def test_search_results_are_kept_in_the_market_cache(monkeypatch):
+    requests = []
+
+    async def fetch(url, timeout=10, fmt="text", headers=None):
+        requests.append(url)
+        return {"success": True, "results": [
+            {"name": "Item %s" % i, "hash_name": "Item %s (Field-Tested)" % i, "asset_description": {"appid": 730}}
+            for i in range(50)]}
+
+    monkeypatch.setattr(aiosteamsearch, "_fetch", fetch)
+    monkeypatch.setattr(aiosteamsearch, "cache", aiosteamsearch.SteamCache())
+    monkeypatch.setattr(aiosteamsearch, "negative_cache", aiosteamsearch.SteamCache())
+    monkeypatch.setattr(aiosteamsearch, "market_cache", aiosteamsearch.SteamCache())
+
+    async def run():
+        return [await aiosteamsearch.get_item_name(name, "730") for name in ("Item 0", "Item 7")]
+
+    assert asyncio.run(run()) == ["Item 0 (Field-Tested)", "Item 7 (Field-Tested)"]
+    assert len(requests) == 1  # Item 7 was found by the search for Item 0
+    assert aiosteamsearch.cache.count() == 2  # only the names which were looked up
+    assert aiosteamsearch.market_cache.count("market_asset") == 50
+
+
+def test_rate_limits_arent_hidden_by_conversions(monkeypatch):
+    async def get_rates(timeout=10):
+        raise aiosteamsearch.SteamRateLimited("api.fixer.io responded with 429")
+
+    monkeypatch.setattr(aiosteamsearch, "get_rates", get_rates)
+    result = aiosteamsearch.ItemResult("$1.00")
+    for call in (lambda: aiosteamsearch.exchange(1, "USD", "GBP"), lambda: aiosteamsearch.convert_many([result], "GBP"),
+                 lambda: result.update_price("GBP", "£")):
+        async def run():
+            return await call()
+
+        with pytest.raises(aiosteamsearch.SteamRateLimited):
+            asyncio.run(run())
+    assert result.price == "1.00"
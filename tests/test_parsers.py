@@ -0,0 +1,215 @@
+"""
+Checks that every page parses to the same results whichever tree builder set_parser picks, and that cutting
+pages short with _cut_rows and scoping them with SoupStrainers doesn't change the results either
+"""
+
+import array
+import asyncio
+import os
+import threading
+
+import pytest
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+import aiosteamsearch
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+PARSERS = [
+    "html.parser",
+    pytest.param("lxml", marks=pytest.mark.skipif(builder_registry.lookup("lxml") is None, reason="lxml isn't installed")),
+]
+
+# pages whose parse function takes a limit, which _cut_rows uses to cut the page short: (fixture, parse function)
+LIMITED_PAGES = {
+    "search": ("search.html", aiosteamsearch._parse_search_page),
+    "category": ("category.html", aiosteamsearch._parse_category_page),
+    "new_category": ("new_category.html", aiosteamsearch._parse_new_page),
+    "stats": ("stats.html", aiosteamsearch._parse_playercounts),
+}
+
+PAGES = {
+    "front_page": ("front_page.html", aiosteamsearch._parse_front_page),
+    "achievements": ("achievements.html", aiosteamsearch._parse_global_achievements),
+    "market_listing": ("market_listing.html", aiosteamsearch._parse_item),
+    "market_item_name": ("market_listing.html", aiosteamsearch._parse_item_name),
+}
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def fields(value):
+    """Turns results in to plain lists and dicts of their fields, so that they can be compared"""
+    if isinstance(value, (list, tuple, array.array)):
+        return [fields(x) for x in value]
+    if isinstance(value, dict):
+        return {k: fields(v) for k, v in value.items()}
+    if hasattr(value, "__dict__"):
+        return dict(fields(vars(value)), __class__=type(value).__name__)
+    return value
+
+
+def parse_expected(func, *args):
+    """Parses a fixture the way every other parse is compared with, the whole page with html.parser"""
+    return fields(aiosteamsearch._run_parse("html.parser", func, *args))
+
+
+@pytest.fixture(params=PARSERS)
+def parser(request):
+    previous = aiosteamsearch.STEAM_PARSER
+    yield aiosteamsearch.set_parser(request.param)
+    aiosteamsearch.STEAM_PARSER = previous
+
+
+@pytest.fixture(params=["scoped", "unscoped"])
+def scoping(request, monkeypatch):
+    """Parses pages either as aiosteamsearch does, or ignoring its SoupStrainers and building the whole tree"""
+    if request.param == "unscoped":
+        monkeypatch.setattr(aiosteamsearch, "_make_soup",
+                            lambda markup, parse_only=None: BeautifulSoup(markup, aiosteamsearch.STEAM_PARSER))
+    return request.param
+
+
+EXPECTED = {}
+for _name, (_fixture, _func) in LIMITED_PAGES.items():
+    EXPECTED[_name] = parse_expected(_func, read_fixture(_fixture), -1)
+for _name, (_fixture, _func) in PAGES.items():
+    EXPECTED[_name] = parse_expected(_func, read_fixture(_fixture))
+
+
+def test_parser_is_used(parser):
+    assert aiosteamsearch.STEAM_PARSER == parser
+    assert aiosteamsearch._make_soup("<p>x</p>").builder.NAME == builder_registry.lookup(parser).NAME
+
+
+@pytest.mark.parametrize("name", sorted(LIMITED_PAGES))
+@pytest.mark.parametrize("limit", [-1, 1, 2, 3])
+def test_limited_pages(parser, scoping, name, limit):
+    fixture, func = LIMITED_PAGES[name]
+    expected = EXPECTED[name] if limit <= 0 else EXPECTED[name][:limit]
+    assert fields(func(read_fixture(fixture), limit)) == expected
+
+
+@pytest.mark.parametrize("name", sorted(LIMITED_PAGES))
+def test_limited_pages_from_str(parser, name):
+    fixture, func = LIMITED_PAGES[name]
+    assert fields(func(read_fixture(fixture).decode("utf-8"), 2)) == EXPECTED[name][:2]
+
+
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_pages(parser, scoping, name):
+    fixture, func = PAGES[name]
+    assert fields(func(read_fixture(fixture))) == EXPECTED[name]
+
+
+@pytest.mark.parametrize("name, tag, cls", [
+    ("search", "a", "search_result_row"),
+    ("category", "a", "search_result_row"),
+    ("new_category", "a", "tab_item"),
+    ("stats", "tr", "player_count_row"),
+])
+def test_cut_rows(name, tag, cls):
+    page = read_fixture(LIMITED_PAGES[name][0])
+    cut = aiosteamsearch._cut_rows(page, tag, cls, 2)
+    assert len(cut) < len(page) and page.startswith(cut)
+    assert aiosteamsearch._cut_rows(page, tag, cls, 100) == page
+    assert aiosteamsearch._cut_rows(page, tag, cls, -1) == page
+
+
+def test_expected_results():
+    """Makes sure the fixtures parse to real results, so the comparisons above aren't between empty lists"""
+    search = EXPECTED["search"]
+    assert [x["title"] for x in search] == ["Counter-Strike 2", "Garry's Mod", "Portal with RTX & Friends", "Portal 2"]
+    assert all(x["__class__"] == "GameResult" for x in search)
+    assert (search[1]["discount"], search[1]["price"], search[1]["discountPrice"]) == ("-50%", "£5.49", "£2.74")
+    assert (search[0]["review"], search[0]["price"]) == ("Very Positive", "Free to Play")
+
+    category = EXPECTED["category"]
+    assert [x["__class__"] for x in category] == ["CategoryResult"] * 4
+    assert (category[1]["price"], category[1]["discount_price"], category[1]["discount"]) == ("£49.99", "£29.99", "-40%")
+    assert category[2]["price"] == "free to play"
+
+    new = EXPECTED["new_category"]
+    assert [x["__class__"] for x in new] == ["NewCategoryResult"] * 4
+    assert [x["title"] for x in new] == ["Diablo® IV", "ARK: Survival Ascended", "Overwatch® 2", "Resident Evil 4"]
+
+    assert EXPECTED["stats"][0] == ["1,012,345", "1,478,291", "Counter-Strike 2", "https://store.steampowered.com/app/730/"]
+    assert len(EXPECTED["stats"]) == 6
+
+    front = EXPECTED["front_page"]
+    assert [x["__class__"] for x in front["new_releases"] + front["upcoming"]] == ["TopResult"] * 4
+    assert [x["title"] for x in front["upcoming"]] == ["Skull & Bones", "Manor Lords"]
+    assert front["specials"][0]["discountPrice"] == "£5.99"
+
+    achievements = EXPECTED["achievements"]["achievements"]
+    assert [x["__class__"] for x in achievements] == ["GlobalAchievement"] * 5
+    assert achievements[0]["desc"] == "Kill two enemy players with a single bullet & live"
+
+    assert EXPECTED["market_item_name"] == "AK-47 | Redline (Field-Tested)"
+
+
+def test_front_page_sale_capsules():
+    """The first top seller is a sale capsule, which is parsed as a SteamSaleResult"""
+    top_sellers = EXPECTED["front_page"]["top_sellers"]
+    assert [x["__class__"] for x in top_sellers] == ["SteamSaleResult", "TopResult", "TopResult", "TopResult"]
+
+
+def test_market_page_from_bytes():
+    """The listing data is found in the raw page, whether it's given as bytes or as str"""
+    page = read_fixture("market_listing.html")
+    item = EXPECTED["market_listing"]
+    assert (item["__class__"], item["price"], item["currency"], item["name"]) == ("ItemResult", "11.43", "GBP", "AK-47 | Redline")
+    assert item["history"]["volumes"] == [94, 101, 87, 1203]
+    assert fields(aiosteamsearch._parse_item(page.decode("utf-8"))) == item
+
+
+def test_queued_parse_keeps_later_parser(monkeypatch):
+    """A parse queued before set_parser runs with the old parser, without setting it back for everything else"""
+    gate = threading.Event()
+
+    def blocked(text):
+        gate.wait(5)
+        return aiosteamsearch._make_soup(text).builder.NAME
+
+    async def run():
+        aiosteamsearch.set_parser("html.parser")
+        queued = asyncio.ensure_future(aiosteamsearch._parse(blocked, "<p>x</p>"))
+        await asyncio.sleep(0.05)
+        aiosteamsearch.STEAM_PARSER = "a parser chosen later"
+        gate.set()
+        return await queued
+
+    monkeypatch.setattr(aiosteamsearch, "STEAM_PARSER", aiosteamsearch.STEAM_PARSER)
+    previous = (aiosteamsearch.STEAM_PARSE_EXECUTOR, aiosteamsearch.STEAM_PARSE_WORKERS)
+    aiosteamsearch.set_parse_executor("thread", 1)
+    try:
+        assert asyncio.run(run()) == builder_registry.lookup("html.parser").NAME
+        assert aiosteamsearch.STEAM_PARSER == "a parser chosen later"
+    finally:
+        aiosteamsearch.set_parse_executor(*previous)
+
+
+def test_malformed_sale_capsules_are_skipped(capsys):
+    page = ('<div id="tab_topsellers_content"><a class="sale_capsule">no link</a>'
+            '<a class="sale_capsule" href="https://store.steampowered.com/app/5/x/" data-ds-appid="5">'
+            '<div class="discount_block"><div class="discount_prices"></div></div></a></div>')
+    assert aiosteamsearch._parse_front_page(page).top_sellers == []
+    assert capsys.readouterr().out == ""
+
+
+def test_skipped_rows_dont_count_towards_limit(parser):
+    page = read_fixture("stats.html").replace(
+        b'<tr class="player_count_row" style="">',
+        b'<tr class="player_count_row"><td>no counts</td><td><a class="gameLink" href="#">Hidden</a></td></tr>\n'
+        b'<tr class="player_count_row" style="">', 1)
+    assert fields(aiosteamsearch._parse_playercounts(page, 2)) == EXPECTED["stats"][:2]
+
+    page = ('<div class="screenshots"><a class="profile_media_item" href="#1">no image</a>'
+            '<a class="profile_media_item" href="#2"><img src="2.jpg"></a>'
+            '<a class="profile_media_item" href="#3"><img src="3.jpg"></a></div>')
+    assert aiosteamsearch._parse_screenshots(page, 2) == ["2.jpg", "3.jpg"]
+    assert aiosteamsearch._parse_screenshots(page, -1) == ["2.jpg", "3.jpg"]
@@ -0,0 +1,80 @@
+"""
+Checks PriceHistory's rolling windows and resampling against straightforward implementations
+"""
+
+import array
+import random
+
+import pytest
+
+import aiosteamsearch
+
+DAY = 86400
+
+
+def history(points):
+    """Builds a PriceHistory from a list of (timestamp, price, volume) tuples"""
+    return aiosteamsearch.PriceHistory(array.array("q", [p[0] for p in points]),
+                                       array.array("d", [p[1] for p in points]),
+                                       array.array("i", [p[2] for p in points]))
+
+
+@pytest.fixture
+def prices():
+    rand = random.Random(20)
+    return history([(i * 3600, round(rand.uniform(0.5, 2), 2), rand.randint(0, 50)) for i in range(200)])
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 24, 200, 300])
+def test_rolling_windows(prices, window):
+    windows = [prices.prices[i - window + 1:i + 1] for i in range(window - 1, len(prices))]
+    assert list(prices.rolling_min(window)) == [min(w) for w in windows]
+    assert list(prices.rolling_max(window)) == [max(w) for w in windows]
+    assert list(prices.rolling_mean(window)) == pytest.approx([sum(w) / window for w in windows])
+
+
+@pytest.mark.parametrize("window", [0, -1])
+def test_rolling_window_must_be_positive(prices, window):
+    for rolling in (prices.rolling_mean, prices.rolling_min, prices.rolling_max):
+        with pytest.raises(ValueError):
+            rolling(window)
+
+
+def test_resample():
+    points = history([(0, 1.0, 1), (3600, 3.0, 3), (DAY + 60, 2.0, 0), (3 * DAY, 5.0, 2), (3 * DAY + 1, 4.0, 2)])
+    daily = points.resample(DAY)
+    assert list(daily.timestamps) == [0, DAY, 3 * DAY]
+    assert list(daily.volumes) == [4, 0, 4]
+    assert list(daily.prices) == [2.5, 2.0, 4.5]  # weighted by volume, a volume of 0 counts as 1
+    assert list(points.resample(DAY, "min").prices) == [1.0, 2.0, 4.0]
+    assert list(points.resample(DAY, "max").prices) == [3.0, 2.0, 5.0]
+    assert list(points.resample(DAY, "first").prices) == [1.0, 2.0, 5.0]
+    assert list(points.resample(DAY, "last").prices) == [3.0, 2.0, 4.0]
+    assert len(aiosteamsearch.PriceHistory().resample(DAY)) == 0
+
+
+def test_resample_checks_its_arguments(prices):
+    with pytest.raises(ValueError):
+        prices.resample(0)
+    with pytest.raises(ValueError):
+        prices.resample(DAY, "median")
+
+
+def test_extract_price_history():
+    page = b'var line1=[["Mar 20 2014 01: +0",0.95,"1,203"],["Mar 20 2014 05: +0",1.5,"4"],["Mar 21 2014 01: +0",2,"7"]];'
+    points = aiosteamsearch._extract_price_history(page, page.index(b"[") + 1)
+    start = 1395273600  # Mar 20 2014 00:00 UTC
+    assert list(points.timestamps) == [start + 3600, start + 5 * 3600, start + DAY + 3600]
+    assert list(points.prices) == [0.95, 1.5, 2.0]
+    assert list(points.volumes) == [1203, 4, 7]
+
+
+def test_unreadable_points_are_skipped():
+    page = (b'var line1=[["Mar 20 2014 01: +0",0.95,"123"],["Mar 20 2014 02: +0",null,"5"],'
+            b'["Mar 20 2014 03: +0",1.1,"many"],["Foo 20 2014 04: +0",1.2,"6"],["Mar 20 2014 05: +0",1.5,"7"]];'
+            b'var line2=[["Mar 21 2014 01: +0",9,"9"]];')
+    points = aiosteamsearch._extract_price_history(page, page.index(b"[") + 1)
+    start = 1395273600  # Mar 20 2014 00:00 UTC
+    assert list(points.timestamps) == [start + 3600, start + 5 * 3600]
+    assert list(points.prices) == [0.95, 1.5]
+    assert list(points.volumes) == [123, 7]
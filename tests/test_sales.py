@@ -0,0 +1,66 @@
+"""
+Checks that the store's prices are cached apart from names, and that iter_game_sales only looks up the names of
+games on sale, once each
+"""
+
+import asyncio
+
+import pytest
+
+import aiosteamsearch
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Stands in for appdetails, mapping appids to their (name, discount percent), every request is kept in requests"""
+    store = {"apps": {}, "requests": []}
+
+    async def fetch(url, timeout=10, fmt="text", headers=None):
+        store["requests"].append(url)
+        query = dict(x.split("=", 1) for x in url.split("?", 1)[1].split("&"))
+        data = {}
+        for appid in query["appids"].split(","):
+            name, percent = store["apps"][appid]
+            price = {"discount_percent": percent} if percent is not None else None
+            data[appid] = {"success": True, "data": {"name": name, "price_overview": price}}
+        return data
+
+    monkeypatch.setattr(aiosteamsearch, "_fetch", fetch)
+    monkeypatch.setattr(aiosteamsearch, "cache", aiosteamsearch.SteamCache())
+    monkeypatch.setattr(aiosteamsearch, "store_cache", aiosteamsearch.SteamCache(max_size=100))
+    monkeypatch.setattr(aiosteamsearch, "app_index", None)
+    return store
+
+
+def test_prices_are_kept_in_the_store_cache(store):
+    store["apps"].update({"10": ("Counter-Strike", 50), "20": ("Team Fortress Classic", None)})
+    prices = asyncio.run(aiosteamsearch.get_price_overviews(["10", "20"]))
+    assert prices == {"10": {"discount_percent": 50}, "20": None}
+    assert asyncio.run(aiosteamsearch.get_price_overviews(["20", "10"])) == prices
+    assert len(store["requests"]) == 1
+    assert aiosteamsearch.store_cache.count("price_overview") == 2 and aiosteamsearch.cache.count() == 0
+
+
+def test_sale_names_are_found_once_per_game(store):
+    store["apps"].update({"10": ("Counter-Strike", 50), "20": ("Team Fortress Classic", 0)})
+    checks = [("10", 25, "gb"), ("10", 25, "us"), ("20", 25, "gb")]
+    cached = {}
+
+    async def run():
+        return [result async for result in aiosteamsearch.iter_game_sales(checks, {}, cached=cached)]
+
+    results = asyncio.run(run())
+    assert sorted(result[4] for result in results) == ["Counter-Strike", "Counter-Strike"]
+    assert len([url for url in store["requests"] if "filters=basic" in url]) == 1
+    assert cached == {"10": ({"discount_percent": 50}, "Counter-Strike"), "20": ({"discount_percent": 0}, None)}
+
+
+def test_cached_games_are_named_once_on_sale(store):
+    store["apps"].update({"20": ("Team Fortress Classic", 50)})
+    cached = {"20": ({"discount_percent": 50}, None)}
+
+    async def run():
+        return [result async for result in aiosteamsearch.iter_game_sales([("20", 25, "gb")], {}, cached=cached)]
+
+    assert [result[4] for result in asyncio.run(run())] == ["Team Fortress Classic"]
+    assert cached["20"] == ({"discount_percent": 50}, "Team Fortress Classic")
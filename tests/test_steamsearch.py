@@ -0,0 +1,50 @@
+"""
+Checks that the synchronous facade keeps the old steamsearch's settings working, and that results' coroutine
+methods fail loudly when they're called from synchronous code
+"""
+
+import asyncio
+
+import pytest
+
+import aiosteamsearch
+import steamsearch
+
+
+def test_result_methods_refuse_sync_calls(monkeypatch):
+    async def get_rates(timeout=10):
+        return {"GBP": 1, "USD": 1.25}
+
+    monkeypatch.setattr(aiosteamsearch, "get_rates", get_rates)
+    result = aiosteamsearch.ItemResult("£0.80")
+    with pytest.raises(TypeError, match="steamsearch.update_price"):
+        result.update_price("USD", "$")
+    assert result.price == "0.80"
+
+    async def run():
+        return await result.update_price("USD", "$")
+
+    asyncio.run(run())
+    assert result.price == "$1.0"
+
+
+def test_update_price_from_sync_code(monkeypatch):
+    async def get_rates(timeout=10):
+        return {"GBP": 1, "USD": 1.25}
+
+    monkeypatch.setattr(aiosteamsearch, "get_rates", get_rates)
+    result = aiosteamsearch.ItemResult("£0.80")
+    try:
+        assert steamsearch.update_price(result, "USD", "$") is result
+    finally:
+        steamsearch.shutdown()
+    assert result.price == "$1.0"
+
+
+def test_settings_are_forwarded(monkeypatch):
+    monkeypatch.setattr(aiosteamsearch, "STEAM_PRINTING", False)
+    steamsearch.STEAM_PRINTING = True
+    assert aiosteamsearch.STEAM_PRINTING is True and steamsearch.STEAM_PRINTING is True
+    assert "STEAM_PRINTING" not in vars(steamsearch)
+    with pytest.raises(AttributeError):
+        steamsearch.STEAM_NOT_A_SETTING
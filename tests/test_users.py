@@ -0,0 +1,63 @@
+"""
+Checks that get_user finds users through GetPlayerSummaries, batched or not
+"""
+
+import asyncio
+
+import pytest
+
+import aiosteamsearch
+
+STEAMID = 76561198000000000
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Stands in for GetPlayerSummaries, which knows one user, every request is kept in the returned list"""
+    requests = []
+
+    async def fetch(url, timeout=10, fmt="text", headers=None):
+        requests.append(url)
+        return {"response": {"players": [{"steamid": str(STEAMID), "personaname": "someone"}]}}
+
+    monkeypatch.setattr(aiosteamsearch, "_fetch", fetch)
+    monkeypatch.setattr(aiosteamsearch, "STEAM_KEY", "key")
+    return requests
+
+
+@pytest.mark.parametrize("window", [0, 0.01])
+@pytest.mark.parametrize("steamid", [STEAMID, str(STEAMID)])
+def test_get_user_by_steamid(requests, monkeypatch, window, steamid):
+    monkeypatch.setattr(aiosteamsearch, "STEAM_USER_BATCH_WINDOW", window)
+    user = asyncio.run(aiosteamsearch.get_user(steamid))
+    assert user is not None and user.id == str(STEAMID)
+    assert len(requests) == 1
+
+
+def test_batched_users_share_a_request(requests):
+    async def run():
+        return await asyncio.gather(aiosteamsearch.get_user(STEAMID), aiosteamsearch.get_user(str(STEAMID)),
+                                    aiosteamsearch.get_user("76561198000000001"))
+
+    first, second, missing = asyncio.run(run())
+    assert first is second and missing is None
+    assert len(requests) == 1
+    assert not aiosteamsearch._user_batch_tasks
+
+
+def test_batch_uses_the_longest_timeout(requests, monkeypatch):
+    timeouts = []
+    fetch = aiosteamsearch._fetch
+
+    async def record(url, timeout=10, fmt="text", headers=None):
+        timeouts.append(timeout)
+        return await fetch(url, timeout, fmt, headers)
+
+    monkeypatch.setattr(aiosteamsearch, "_fetch", record)
+
+    async def run():
+        return await asyncio.gather(aiosteamsearch.get_user(STEAMID, timeout=5),
+                                    aiosteamsearch.get_user("76561198000000001", timeout=30))
+
+    asyncio.run(run())
+    assert timeouts == [30]